@@ -0,0 +1,59 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Compares the Bluetooth backend's packet rate with and without write-without-response, against a
+# stand-in for the Bleak client instead of a robot. The stand-in models a 15 ms connection interval:
+# a write with response takes one interval, and up to four write commands fit in one interval.
+# It answers battery queries one interval after receiving them, like the robot would.
+
+import asyncio
+from struct import pack
+from time import monotonic
+from types import SimpleNamespace
+
+from irobot_edu_sdk.backend.bluetooth_desktop import Bluetooth
+from irobot_edu_sdk.packet import Packet
+
+SECONDS = 3
+CONNECTION_INTERVAL = 0.015
+WRITES_PER_INTERVAL = 4
+
+
+class StandInClient:
+    def __init__(self, backend: Bluetooth):
+        self._backend = backend
+        self.is_connected = True
+        self.mtu_size = 247
+        characteristic = SimpleNamespace(properties=['write', 'write-without-response'],
+                                         max_write_without_response_size=self.mtu_size - 3)
+        self.services = SimpleNamespace(get_characteristic=lambda uuid: characteristic)
+
+    async def write_gatt_char(self, uuid, data, response):
+        await asyncio.sleep(CONNECTION_INTERVAL if response else CONNECTION_INTERVAL / WRITES_PER_INTERVAL)
+        packet = Packet.from_bytes(bytes(data))
+        if (packet.dev, packet.cmd) == (14, 1):
+            answer = Packet(14, 1, packet.inc, bytes(16), force_crc=True).to_bytearray()
+            asyncio.get_event_loop().call_later(CONNECTION_INTERVAL, self._backend.rx_handler, None, answer)
+
+
+async def measure(write_without_response: bool, dev: int, cmd: int) -> float:
+    backend = Bluetooth(write_without_response=write_without_response)
+    backend._open_rx()
+    backend._client = StandInClient(backend)
+    backend._check_write_without_response()
+
+    count, end = 0, monotonic() + SECONDS
+    while monotonic() < end:
+        await backend.write_packet(Packet(dev, cmd, count % 256, pack('>ii', 100, 100)))
+        count += 1
+    return count / SECONDS
+
+
+async def main():
+    for label, dev, cmd in (('Wheel speeds', 1, 4), ('Battery queries', 14, 1)):
+        acknowledged = await measure(False, dev, cmd)
+        unacknowledged = await measure(True, dev, cmd)
+        print(f'{label}: {acknowledged:.0f} packets/s with response, {unacknowledged:.0f} packets/s without')
+
+asyncio.run(main())
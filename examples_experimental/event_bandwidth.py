@@ -0,0 +1,40 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Measures received packets per second for a bumper-only program, first with every event
+# source streaming (the robot's default) and then with only the events the program uses.
+
+from irobot_edu_sdk.backend.bluetooth import Bluetooth
+from irobot_edu_sdk.robots import event, Root
+
+robot = Root(Bluetooth())
+SECONDS = 10
+
+
+async def packets_per_second(robot):
+    start = robot.packets_received
+    await robot.wait(SECONDS)
+    return (robot.packets_received - start) / SECONDS
+
+
+@event(robot.when_bumped, [])
+async def bumped(robot):
+    print('Bumped')
+
+
+@event(robot.when_play)
+async def play(robot):
+    robot.auto_events = False
+    await robot.enable_events(bytes([0xFF] * 16))
+    print(f'Measuring for {SECONDS} s with all events enabled...')
+    before = await packets_per_second(robot)
+
+    robot.auto_events = True
+    await robot.sync_events()
+    print(f'Measuring for {SECONDS} s with only the bumper (and stop button/stall) events enabled...')
+    after = await packets_per_second(robot)
+
+    print(f'All events: {before:.1f} packets/s, bumper only: {after:.1f} packets/s')
+
+robot.play()
@@ -0,0 +1,34 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Connects to every robot named on the command line and reports how long each took. All backends
+# share one scan, and at most manager.slots connections are set up at a time.
+#
+#   python fleet_connect.py ROOT1 ROOT2 ROOT3 ...
+
+import sys
+
+from irobot_edu_sdk.backend.bluetooth import Bluetooth
+from irobot_edu_sdk.backend.connection_manager import manager
+from irobot_edu_sdk.robots import event, Root
+
+manager.slots = 4
+robots = [Root(Bluetooth(name)) for name in sys.argv[1:]]
+played = 0
+
+
+async def report(robot):
+    global played
+    played += 1
+    if played < len(robots):
+        return
+    for name, seconds in sorted(manager.connect_times.items(), key=lambda item: item[1]):
+        scan = manager.scan_times.get(name)
+        print(f'{name}: connected after {seconds:.1f} s' + (f' (found after {scan:.1f} s)' if scan else ' (cached)'))
+    await robot.play_note(440, 0.25)
+
+for robot in robots:
+    event(robot.when_play)(report)
+
+robots[0].play()
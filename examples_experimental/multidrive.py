@@ -40,7 +40,9 @@ async def play(robot):
         vl = max(min((  angle  + 1) * speed, 10), -10)
         vr = max(min(((-angle) + 1) * speed, 10), -10)
 
-        await robot.set_wheel_speeds(vl, vr)
+        # Only the latest speeds are sent, at most once per robot.wheel_stream.interval.
+        robot.stream_wheel_speeds(vl, vr)
+        await hand_over()
 
 wheel.play()
 #robot.play() - only want to have one call to play since it's blocking; doesn't matter which object you call from
@@ -0,0 +1,61 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Battery level round trips against a simulated robot behind each emulated link preset: one request at a time
+# and eight in flight at once, with a 1 s timeout so that lost requests or responses show up quickly.
+
+import asyncio
+from time import monotonic
+
+from irobot_edu_sdk.backend.impaired import Impaired, PRESETS
+from irobot_edu_sdk.backend.simulator import Simulator
+from irobot_edu_sdk.robots import event, Root
+
+REQUESTS = 200
+IN_FLIGHT = 8
+
+robots = {}
+for preset in PRESETS:
+    robots[preset] = Root(Impaired(Simulator(), preset, seed=1))
+    robots[preset].DEFAULT_TIMEOUT = 1
+results = {}
+
+
+async def round_trips(robot, in_flight):
+    times, timeouts = [], 0
+
+    async def requester(count):
+        nonlocal timeouts
+        for _ in range(count):
+            start = monotonic()
+            level = await robot.get_battery_level()
+            if level == (0, 0):
+                timeouts += 1
+            else:
+                times.append(monotonic() - start)
+
+    start = monotonic()
+    await asyncio.gather(*(requester(REQUESTS // in_flight) for _ in range(in_flight)))
+    elapsed = monotonic() - start
+    times.sort()
+    return times[len(times) // 2] * 1000, times[int(len(times) * 0.95)] * 1000, timeouts, REQUESTS / elapsed
+
+
+async def measure(robot):
+    preset = next(name for name, r in robots.items() if r is robot)
+    results[preset] = (await round_trips(robot, 1), await round_trips(robot, IN_FLIGHT))
+    if len(results) == len(robots):
+        for name, (single, pipelined) in results.items():
+            print(f'{name}:')
+            for label, (median, p95, timeouts, rate) in (('one at a time', single), (f'{IN_FLIGHT} in flight', pipelined)):
+                print(f'  {label}: median {median:.1f} ms, 95th percentile {p95:.1f} ms, '
+                      f'{timeouts} timeouts, {rate:.0f} requests/s')
+            print(f'  impairments: {robots[name]._backend.stats()}')
+        asyncio.get_event_loop().stop()
+
+
+for robot in robots.values():
+    event(robot.when_play)(measure)
+
+next(iter(robots.values())).play()
@@ -0,0 +1,83 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Measures CPU use per robot as the number of serial-connected robots grows, for one Serial
+# backend per port and for a SerialHub serving all ports. The robots are simulated with pty
+# pairs (POSIX only, needs pySerial): a thread writes RATE packets per second into each master
+# side, and one task per robot reads them from its backend.
+
+import asyncio
+import os
+import tty
+from binascii import hexlify
+from threading import Thread
+from time import monotonic, process_time, sleep, thread_time
+
+from irobot_edu_sdk.backend.serial import Serial
+from irobot_edu_sdk.backend.serial_hub import SerialHub
+from irobot_edu_sdk.packet import Packet
+
+COUNTS = (1, 4, 16, 64)
+RATE = 50  # packets per second per robot, like a robot streaming a couple of sensors
+SECONDS = 3
+FRAME = hexlify(Packet(12, 0, 0, bytes(16), force_crc=True).to_bytes()) + b'\n'
+
+
+def feed(masters, running, feeder_cpu):
+    start = thread_time()
+    next_time = monotonic()
+    while running[0]:
+        for master in masters:
+            os.write(master, FRAME)
+        next_time += 1 / RATE
+        sleep(max(0, next_time - monotonic()))
+    feeder_cpu[0] = thread_time() - start
+
+
+async def consume(backend, counts, i):
+    while True:
+        await backend.read_packet()
+        counts[i] += 1
+
+
+async def measure(count: int, hub: bool) -> float:
+    pairs = [os.openpty() for _ in range(count)]
+    for master, slave in pairs:
+        tty.setraw(master)
+        tty.setraw(slave)
+    serial_hub = SerialHub() if hub else None
+    backends = [serial_hub.port(os.ttyname(slave)) if hub else Serial(os.ttyname(slave)) for _, slave in pairs]
+    for backend in backends:
+        await backend.connect()
+    counts = [0] * count
+    tasks = [asyncio.ensure_future(consume(backend, counts, i)) for i, backend in enumerate(backends)]
+
+    running, feeder_cpu = [True], [0.0]
+    feeder = Thread(target=feed, args=([master for master, _ in pairs], running, feeder_cpu))
+    cpu = process_time()
+    feeder.start()
+    await asyncio.sleep(SECONDS)
+    running[0] = False
+    feeder.join()
+    cpu = process_time() - cpu - feeder_cpu[0]
+
+    for task in tasks:
+        task.cancel()
+    for backend in backends:
+        await backend.disconnect()
+    for master, slave in pairs:
+        os.close(master)
+        os.close(slave)
+    received = sum(counts) / (count * RATE * SECONDS)
+    return 100 * cpu / SECONDS / count, received
+
+
+async def main():
+    print('robots  Serial CPU/robot  SerialHub CPU/robot')
+    for count in COUNTS:
+        serial, _ = await measure(count, hub=False)
+        hub, received = await measure(count, hub=True)
+        print(f'{count:6}  {serial:14.2f} %  {hub:17.2f} %   ({received:.0%} of packets received)')
+
+asyncio.run(main())
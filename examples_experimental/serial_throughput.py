@@ -0,0 +1,109 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Measures how many packets per second the Serial backend can receive and send, over a pty
+# loopback instead of a robot (POSIX only, needs pySerial). For reads, a thread writes hex frames
+# into the master side as fast as the pty takes them; for writes, a thread drains it. The
+# byte-at-a-time reader and the one-write-per-packet writer the backend used before are measured
+# on the same setup for comparison.
+
+import asyncio
+import os
+import tty
+from binascii import hexlify, unhexlify
+from threading import Thread
+from time import monotonic
+
+from irobot_edu_sdk.backend.serial import Serial
+from irobot_edu_sdk.packet import Packet
+
+SECONDS = 5
+FRAME = hexlify(Packet(0, 4, 0, bytes(range(16)), force_crc=True).to_bytes()) + b'\n'
+
+
+def feed(master: int, running):
+    burst = FRAME * 100
+    while running[0]:
+        try:
+            os.write(master, burst)
+        except OSError:
+            break
+
+
+def drain(master: int, running, received):
+    while running[0]:
+        try:
+            received[0] += os.read(master, 65536).count(b'\n')
+        except OSError:
+            break
+
+
+async def byte_at_a_time(backend: Serial) -> Packet:
+    string = b''
+    while not (string.endswith(b'\n') and len(string) > 40):
+        await asyncio.sleep(0)
+        while not backend._serial.inWaiting():
+            await asyncio.sleep(0)
+        string += backend._serial.read(1)
+    return Packet.from_bytes(unhexlify(string[-41:-1]))
+
+
+async def measure(read, bulk=True) -> float:
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    backend = Serial(os.ttyname(slave))
+    await backend.connect()
+    if not bulk:
+        backend._stop_reader()
+    running = [True]
+    Thread(target=feed, args=(master, running), daemon=True).start()
+
+    count, end = 0, monotonic() + SECONDS
+    while monotonic() < end:
+        await read(backend)
+        count += 1
+    running[0] = False
+    await backend.disconnect()
+    os.close(master)
+    os.close(slave)
+    return count / SECONDS
+
+
+async def one_write_per_packet(backend: Serial, packet: Packet):
+    backend._serial.write(hexlify(packet.to_bytes()) + b'\n')
+
+
+async def measure_writes(write) -> float:
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    tty.setraw(master)
+    backend = Serial(os.ttyname(slave))
+    await backend.connect()
+    running, received = [True], [0]
+    Thread(target=drain, args=(master, running, received), daemon=True).start()
+
+    packet = Packet(1, 4, 0, bytes(8), force_crc=True)
+    end = monotonic() + SECONDS
+    while monotonic() < end:
+        # Bursts like a pipelined program's: several commands queued before anything awaits the port.
+        await asyncio.gather(*(write(backend, packet) for _ in range(10)))
+    await backend.disconnect()
+    await asyncio.sleep(0.1)
+    running[0] = False
+    os.close(master)
+    os.close(slave)
+    return received[0] / SECONDS
+
+
+async def main():
+    bulk = await measure(lambda backend: backend.read_packet())
+    print(f'Bulk reader: {bulk:,.0f} packets/s')
+    legacy = await measure(byte_at_a_time, bulk=False)
+    print(f'Byte-at-a-time reader: {legacy:,.0f} packets/s')
+    coalesced = await measure_writes(lambda backend, packet: backend.write_packet(packet))
+    print(f'Coalesced writer: {coalesced:,.0f} packets/s')
+    legacy = await measure_writes(one_write_per_packet)
+    print(f'One write per packet: {legacy:,.0f} packets/s')
+
+asyncio.run(main())
@@ -0,0 +1,48 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Time to summarize a trace of ten million packets with python -m irobot_edu_sdk.trace's load() and analyze():
+# battery and accelerometer requests with their responses, and bumper events. Needs NumPy.
+
+import os
+import tempfile
+from time import perf_counter
+
+from irobot_edu_sdk.backend.trace_file import RX, TX, TraceWriter
+from irobot_edu_sdk.packet import Packet
+from irobot_edu_sdk.trace import analyze, load
+
+PACKETS = 10000000
+
+
+def write_trace(path: str, compression):
+    # A few distinct packets, reused: writing, not encoding packets, is what is being timed elsewhere.
+    requests = [(Packet(14, 1, inc, force_crc=True), Packet(14, 1, inc, bytes(16), force_crc=True)) for inc in range(256)]
+    bump = Packet(12, 0, 0, bytes(16), force_crc=True)
+    writer = TraceWriter(path, compression, block_records=65536)
+    for i in range(PACKETS // 5):
+        request, response = requests[i % 256]
+        writer.write(TX, request)
+        writer.write(RX, response)
+        writer.write(TX, request)
+        writer.write(RX, response)
+        writer.write(RX, bump)
+    writer.close()
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'long.trace')
+    for compression in (None, 'zlib'):
+        write_trace(path, compression)
+        start = perf_counter()
+        columns = load(path)
+        loaded = perf_counter()
+        summary = analyze(columns)
+        done = perf_counter()
+        print(f'{compression or "none"}: {summary["records"]} records ({os.path.getsize(path) / 1e6:.0f} MB) '
+              f'loaded in {loaded - start:.2f} s, analyzed in {done - loaded:.2f} s')
+        os.remove(path)
+
+
+main()
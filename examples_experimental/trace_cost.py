@@ -0,0 +1,51 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Cost of recording a long session, per compression: the time to write each packet, the file size, and the time
+# to seek to the middle of the trace and read one second of it. The packets are the sensor traffic of an active
+# robot, about 200 packets/s, so 720,000 packets stand for an hour.
+
+import os
+import tempfile
+from itertools import islice
+from struct import pack
+from time import perf_counter
+
+from irobot_edu_sdk.backend.trace_file import TX, RX, TraceReader, TraceWriter
+from irobot_edu_sdk.packet import Packet
+
+PACKETS = 720000
+PER_SECOND = 200
+
+
+def packets():
+    for i in range(PACKETS):
+        if i % 10 == 0:
+            yield TX, Packet(14, 1, i % 256, bytes(), force_crc=True)
+        else:
+            yield RX, Packet(16, 1, i % 256, pack('>Ihhh', i * 5, i % 7, -(i % 11), 1000), force_crc=True)
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'session.trace')
+    stream = list(packets())
+    for compression in (None, 'zlib', 'lzma'):
+        writer = TraceWriter(path, compression, block_seconds=0.01)
+        start = perf_counter()
+        for direction, packet in stream:
+            writer.write(direction, packet)
+        writer.close()
+        write_us = (perf_counter() - start) / PACKETS * 1e6
+        size = os.path.getsize(path)
+
+        with TraceReader(path) as reader:
+            middle = reader.duration / 2
+            start = perf_counter()
+            count = sum(1 for _ in islice(reader.read(middle), PER_SECOND))
+            seek_ms = (perf_counter() - start) * 1000
+        print(f'{compression or "none"}: {write_us:.2f} us per packet written, {size / PACKETS:.1f} bytes per packet, '
+              f'{count} packets from the middle read in {seek_ms:.2f} ms')
+
+
+main()
@@ -0,0 +1,56 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+# Compares the web Bluetooth backend writing one packet per worker call with batching the packets queued
+# while waiting for the worker, against the pure-Python worker stand-in and simulated robots. The stand-in
+# models a 2 ms message round trip to the worker and 0.5 ms per packet written.
+# Each robot has four tasks writing packets, like a program with several event handlers running at once.
+# Writing one packet per call only supports one robot, so several robots are measured batched only.
+
+import asyncio
+from struct import pack
+from time import monotonic
+
+from irobot_edu_sdk.backend import worker_standin
+
+worker = worker_standin.install(call_time=0.002, packet_time=0.0005)
+
+from irobot_edu_sdk.backend.bluetooth_web import Bluetooth
+from irobot_edu_sdk.packet import Packet
+
+SECONDS = 3
+WRITERS = 4
+
+
+async def measure(robots: int, batch_writes: bool) -> tuple:
+    backends = []
+    for i in range(robots):
+        backend = Bluetooth(batch_writes=batch_writes)
+        backend.on_data_reception(lambda data: None)
+        await worker.add_device(f'{"batched" if batch_writes else "single"}-{robots}-{i}')
+        backends.append(backend)
+
+    count = 0
+    end = monotonic() + SECONDS
+
+    async def writer(backend):
+        nonlocal count
+        while monotonic() < end:
+            await backend.write_packet(Packet(1, 4, count % 256, pack('>ii', 100, 100)))
+            count += 1
+
+    calls = worker.calls
+    await asyncio.gather(*(writer(backend) for backend in backends for _ in range(WRITERS)))
+    return count / SECONDS, (worker.calls - calls) / SECONDS
+
+
+async def main():
+    single, single_calls = await measure(1, False)
+    batched, batched_calls = await measure(1, True)
+    print(f'1 robot: {single:.0f} packets/s in {single_calls:.0f} calls/s one at a time, '
+          f'{batched:.0f} packets/s in {batched_calls:.0f} calls/s batched')
+    batched, batched_calls = await measure(4, True)
+    print(f'4 robots: {batched:.0f} packets/s in {batched_calls:.0f} calls/s batched')
+
+asyncio.run(main())
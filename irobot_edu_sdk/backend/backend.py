@@ -2,10 +2,25 @@
 # Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2020-2022 iRobot Corporation. All rights reserved.
 #
 
+try:
+    import asyncio
+    from typing import Optional
+except ImportError:
+    import uasyncio as asyncio
+
 from ..packet import Packet
 
 
 class Backend:
+    """Interface of all robot connections.
+
+    Backends that receive packets from a callback or a thread hand them over with _deliver(),
+    and inherit a read_packet() that sleeps until a packet arrives instead of polling.
+    Delivering None wakes the reader when the connection drops; is_connected() must then be False."""
+
+    _rx_queue = None
+    _rx_loop = None
+
     async def connect(self):
         """Connect to robot"""
         raise NotImplementedError()
@@ -22,6 +37,24 @@ class Backend:
         """Write one packet to the robot"""
         raise NotImplementedError()
 
-    async def read_packet(self) -> Packet:
-        """Read one packet from the robot"""
-        raise NotImplementedError()
+    async def read_packet(self) -> Optional[Packet]:
+        """Read one packet from the robot, or None if the connection dropped while waiting"""
+        self._open_rx()
+        return await self._rx_queue.get()
+
+    def _open_rx(self):
+        """Create the receive queue on the running loop. Call from connect(), before packets can arrive."""
+        if self._rx_queue is None:
+            self._rx_loop = asyncio.get_event_loop()
+            self._rx_queue = asyncio.Queue()
+
+    def _deliver(self, packet: Optional[Packet]):
+        """Queue a received packet for read_packet(). Safe to call from any thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._rx_loop:
+            self._rx_queue.put_nowait(packet)
+        else:
+            self._rx_loop.call_soon_threadsafe(self._rx_queue.put_nowait, packet)
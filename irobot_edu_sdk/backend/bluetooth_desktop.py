@@ -8,58 +8,160 @@ This is a Bluetooth Low Energy class that implements the Backend interface metho
 It is compatible with CPython on macOS, Windows, and Linux using the Bleak library.
 """
 
-from asyncio import sleep, Lock
-from queue import SimpleQueue
 from typing import Optional
-from bleak import BleakClient, BleakScanner
+from bleak import BleakClient
 from .backend import Backend
+from .device_cache import DeviceCache
+from .connection_manager import ConnectionManager, manager
+from .scanner import ROOT_ID_SERVICE, UART_SERVICE
+from .scheduler import Priority, TxScheduler, classify
 from ..packet import Packet
 
 
 class Bluetooth(Backend):
-    ROOT_ID_SERVICE = "48c5d828-ac2a-442d-97a3-0c9822b04979"
-    UART_SERVICE = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
+    ROOT_ID_SERVICE = ROOT_ID_SERVICE
+    UART_SERVICE = UART_SERVICE
     TX_CHARACTERISTIC = "6e400002-b5a3-f393-e0a9-e50e24dcca9e"
     RX_CHARACTERISTIC = "6e400003-b5a3-f393-e0a9-e50e24dcca9e"
+    DEVICE_NAME_CHARACTERISTIC = "00002a00-0000-1000-8000-00805f9b34fb"  # GAP Device Name.
 
-    def __init__(self, name: str = None, address: Optional[str] = None):
-        """If no name is provided, connects to the first device found."""
+    CACHED_CONNECT_TIMEOUT = 5.0  # seconds to try a cached address before scanning
+
+    def __init__(self, name: str = None, address: Optional[str] = None,
+                 write_without_response: bool = False, window: int = 8,
+                 device_cache: Optional[DeviceCache] = None, rank_window: Optional[float] = None,
+                 connection_manager: ConnectionManager = manager, use_device_cache: bool = True,
+                 cache_unnamed: bool = False):
+        """If no name is provided, connects to the first device found. With rank_window, keeps listening
+        that many seconds after the first match and connects to the robot with the strongest signal.
+
+        The robot connected to for a name is remembered in device_cache (by default, a DeviceCache in the
+        user's cache directory), and the next connect() tries that address directly before scanning.
+        Pass use_device_cache=False to always scan. Without a name the cache is only used with
+        cache_unnamed=True: Bluetooth() then connects to the robot used last, not the first one found.
+        Backends of one connection_manager share their scan and its limited connection slots.
+
+        With write_without_response, packets other than stops are sent as GATT write commands, which do
+        not wait a connection interval for the write response. At most `window` of them are in flight:
+        a credit returns when the robot's protocol response to the packet arrives, and when credits
+        run out the next packet is written with response, which acknowledges all earlier writes."""
         self._name = name
         self._address = address
         self._device = None
         self._client: Optional[BleakClient] = None
-        self._queue: SimpleQueue = SimpleQueue()
-        self._txlock = Lock()
+        if not use_device_cache or (name is None and not cache_unnamed):
+            device_cache = None
+        elif device_cache is None:
+            device_cache = DeviceCache()
+        self._cache = device_cache
+        self._rank_window = rank_window
+        self._manager = connection_manager
+        self._tx = TxScheduler(self._write)
+        self.write_without_response = write_without_response
+        self.window = window
+        self._credits = window
+        self._unacknowledged = set()  # (dev, cmd, inc) written without response and not yet answered.
+        self.writes_without_response = 0
+        self.writes_with_response = 0
 
     def rx_handler(self, characteristic, data):
-        self._queue.put(Packet.from_bytes(bytes(data)))
+        packet = Packet.from_bytes(bytes(data))
+        key = (packet.dev, packet.cmd, packet.inc)
+        if key in self._unacknowledged:
+            self._unacknowledged.discard(key)
+            self._credits = min(self._credits + 1, self.window)
+        self._deliver(packet)
 
     async def connect(self):
         """This method does not exit until a robot is found"""
+        self._open_rx()
+        await self._manager.connect(self)
 
-        while not self._address:
-            if self._name is not None: # If a name is given, try to connect to that
-                device = await BleakScanner.find_device_by_name(self._name)
-                if device:
-                    self._address = device.address
-                    self._device = device
-            else: # If no name is given, connect to first device with Root ID service
-                discovered = await BleakScanner.discover(service_uuids=[self.ROOT_ID_SERVICE, self.UART_SERVICE], return_adv=True)
-                for device, adv_data in discovered.values():
-                    if self.ROOT_ID_SERVICE in adv_data.service_uuids:
-                        if self._name is None or self._name == device.name:
-                            self._address = device.address
-                            self._device = device
-                            break
-        if self._device:
+    async def _connect_cached(self, claimed: set) -> bool:
+        """Try the address this name last connected to, without scanning, unless another backend claimed it.
+        The robot there must still have the expected name: robots can be renamed, and addresses reused."""
+        entry = self._cache.lookup(self._name)
+        if not entry or entry['address'] in claimed:
+            return False
+        claimed.add(entry['address'])
+        print(f'Connecting to {entry["name"] or "last robot"} ({entry["address"]}) from cache')
+        try:
+            self._client = BleakClient(entry['address'], timeout=self.CACHED_CONNECT_TIMEOUT,
+                                       disconnected_callback=self._disconnected)
+            if await self._client.connect():
+                name = await self._device_name()
+                expected = self._name or entry['name']
+                if name is not None and expected and name != expected:
+                    print(f'Cached address {entry["address"]} is now {name}, not {expected}; scanning')
+                    client, self._client = self._client, None
+                    await client.disconnect()
+                else:
+                    self._address = entry['address']
+                    await self._connected()
+                    self._cache.remember(self._name, self._address, name or entry['name'],
+                                         entry.get('rssi'))  # Updates last_seen.
+                    return True
+        except Exception as e:
+            print(f'Cached robot not reachable ({e}), scanning')
+        self._client = None
+        claimed.discard(entry['address'])
+        self._cache.forget(self._name)
+        return False
+
+    async def _device_name(self) -> Optional[str]:
+        """The connected robot's name, or None where the GAP service is hidden (e.g. by macOS)."""
+        try:
+            data = await self._client.read_gatt_char(self.DEVICE_NAME_CHARACTERISTIC)
+        except Exception:
+            return None
+        return bytes(data).decode('utf-8', 'replace').rstrip('\0')
+
+    async def _connect_found(self, device=None, rssi: Optional[int] = None) -> bool:
+        """Connect to a discovered device, or to the address given to the constructor."""
+        if device:
+            self._device = device
+            self._address = device.address
             print(f'Connecting to {device.name} ({device.address})')
-            self._client = BleakClient(self._device)
+            self._client = BleakClient(device, disconnected_callback=self._disconnected)
         else:
             print(f'Connecting to {self._address}')
-            self._client = BleakClient(self._address)
+            self._client = BleakClient(self._address, disconnected_callback=self._disconnected)
+
+        if not await self._client.connect():
+            return False
+        await self._connected()
+        if self._cache is not None:
+            self._cache.remember(self._name, self._address, device.name if device else None, rssi)
+        return True
 
-        if await self._client.connect():
-            await self._client.start_notify(self.RX_CHARACTERISTIC, self.rx_handler)
+    async def _connected(self):
+        await self._client.start_notify(self.RX_CHARACTERISTIC, self.rx_handler)
+        self._credits = self.window
+        self._unacknowledged.clear()
+        self._check_write_without_response()
+
+    def _disconnected(self, client):
+        if client is self._client:
+            self._deliver(None)  # Wake the reader, which then finds is_connected() False.
+
+    def _check_write_without_response(self):
+        """Fall back to acknowledged writes if the connection can't take a packet per write command."""
+        if not self.write_without_response:
+            return
+        try:
+            characteristic = self._client.services.get_characteristic(self.TX_CHARACTERISTIC)
+            supported = 'write-without-response' in characteristic.properties
+            size = characteristic.max_write_without_response_size
+        except AttributeError:
+            supported, size = True, self._client.mtu_size - 3
+        if not supported:
+            self._fall_back('the robot does not support it')
+        elif size < Packet.PACKET_LEN:
+            self._fall_back(f'the MTU only allows {size} byte writes')
+
+    def _fall_back(self, reason):
+        print(f'Warning: not using write without response, {reason}')
+        self.write_without_response = False
 
     async def is_connected(self) -> bool:
         return self._client.is_connected if self._client else False
@@ -68,13 +170,35 @@ class Bluetooth(Backend):
         if await self.is_connected():
             await self._client.disconnect()
         self._client = None
+        if self._address:
+            self._manager.release(self._address)
 
-    async def read_packet(self) -> Packet:
-        while self._queue.empty():
-            await sleep(0)
-        return self._queue.get()
-
-    async def write_packet(self, packet: Packet):
+    async def write_packet(self, packet: Packet, priority: Optional[int] = None, deadline: Optional[float] = None):
+        """Queue a packet for the robot. Higher priority classes (see scheduler.Priority) are sent first;
+        a packet still queued `deadline` seconds from now is dropped instead of being sent late.
+        priority and deadline are specific to this backend: Robot methods do not pass them.
+        Returns False if the packet was dropped."""
         if self._client:
-            async with self._txlock:
-                await self._client.write_gatt_char(self.TX_CHARACTERISTIC, packet.to_bytearray(), True)
+            return await self._tx.submit(packet, priority, deadline)
+        return False
+
+    async def _write(self, packet: Packet):
+        if self.write_without_response and self._credits > 1 and classify(packet) != Priority.EMERGENCY:
+            self._credits -= 1
+            self._unacknowledged.add((packet.dev, packet.cmd, packet.inc))
+            try:
+                await self._client.write_gatt_char(self.TX_CHARACTERISTIC, packet.to_bytearray(), False)
+                self.writes_without_response += 1
+                return
+            except Exception as e:
+                self._fall_back(f'write failed: {e}')
+
+        await self._client.write_gatt_char(self.TX_CHARACTERISTIC, packet.to_bytearray(), True)
+        self.writes_with_response += 1
+        # Writes are delivered in order, so this acknowledgement covers everything written before it.
+        self._credits = self.window
+        self._unacknowledged.clear()
+
+    def tx_stats(self):
+        """Transmit queue depth and wait time per priority class."""
+        return self._tx.stats()
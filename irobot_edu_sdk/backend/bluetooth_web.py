@@ -3,20 +3,33 @@
 #
 
 import asyncio
+from collections import deque
 from irobot_edu_sdk.backend.backend import Backend
 from irobot_edu_sdk.packet import Packet
 from worker_comm import ble_write_packet, ble_disconnect, stop_program, debug_println
+try:
+    from worker_comm import ble_write_packets  # Workers that take several packets for one device per call.
+except ImportError:
+    ble_write_packets = None
 
 
 class Bluetooth(Backend):
     # TODO: The whole dictionary-based system, here works for devices that do not specify anything about the physical device with wich they want to connect. All this will change once the web version gets integrated into the Flutter app-
     _ble_devices = {}
+    _unassigned = deque()  # Added device ids no backend has claimed yet, in the order they were added.
+    _waiting = deque()     # Backends that were created before a device was added for them.
     _can_write_subscribers = []
 
+    MAX_BATCH = 16  # Packets per worker call.
+
     @staticmethod
     def bluetooth_add_device(device_id):
         if not device_id in Bluetooth._ble_devices:
             Bluetooth._ble_devices[device_id] = None
+            if Bluetooth._waiting:
+                Bluetooth._waiting.popleft()._assign(device_id)
+            else:
+                Bluetooth._unassigned.append(device_id)
 
     @staticmethod
     def bluetooth_data_reception(device_id, service_id, characteristic_id, data):
@@ -26,10 +39,14 @@ class Bluetooth(Backend):
             if (device != None):
                 device['callback'](data)  # Data reception callback.
 
-    # TODO: Add Multi-device support based on the ble.js functionality of registering a canWrite per device/service/characteristic key (see the Dart version).
-
     @staticmethod
-    def bluetooth_can_write():
+    def bluetooth_can_write(device_id=None):
+        """The worker can take the next write: for device_id only, or for every backend if the worker does not say."""
+        if device_id is not None:
+            device = Bluetooth._ble_devices.get(device_id)
+            if device != None:
+                device['can_write']()
+            return
         for subscriber in Bluetooth._can_write_subscribers:
             can_write = getattr(subscriber, 'can_write', None)
             if callable(can_write):
@@ -37,9 +54,13 @@ class Bluetooth(Backend):
 
     # TODO: Name functionality not implemented.
     # TODO: The address param from the desktop SDK may never be implemented in the web version, so document accordingly.
-    def __init__(self, name: str = None):
+    def __init__(self, name: str = None, batch_writes: bool = True):
+        """With batch_writes, packets written while waiting for the worker go out together in one call,
+        if the worker supports it."""
         self.id = ''
         self.can_write_lock = asyncio.Lock()
+        self._batching = batch_writes and ble_write_packets is not None
+        self._batch = None  # (packets, future set once sent) collected while waiting for can_write.
         Bluetooth._can_write_subscribers.append(self)
         self.DEFAULT_TIMEOUT = 0.5
 
@@ -57,26 +78,56 @@ class Bluetooth(Backend):
         ble_disconnect(self.id)
 
     def can_write(self):
-        try:
+        if self.can_write_lock.locked():  # Workers that do not say which device can write notify every backend.
             self.can_write_lock.release()
-        finally:
-            pass
 
     async def write_packet(self, packet: Packet):
-        await self.can_write_lock.acquire()
-        await ble_write_packet(packet.to_bytearray())
         # TODO: Evaluate if a timeout system for releasing the lock will be added.
+        if not self._batching:
+            await self.can_write_lock.acquire()
+            await ble_write_packet(packet.to_bytearray())
+            return
+
+        data = packet.to_bytearray()
+        while self._batch is not None:
+            # Another write is waiting for can_write: go out with it, if there is room.
+            packets, sent = self._batch
+            if len(packets) < self.MAX_BATCH:
+                packets.append(data)
+                await asyncio.shield(sent)
+                return
+            await asyncio.shield(sent)
+
+        packets, sent = self._batch = ([data], asyncio.get_event_loop().create_future())
+        try:
+            await self.can_write_lock.acquire()
+            self._batch = None
+            await ble_write_packets(self.id, packets)
+            sent.set_result(None)
+        except BaseException as e:
+            if self._batch is not None and self._batch[1] is sent:
+                self._batch = None
+            if isinstance(e, asyncio.CancelledError):
+                sent.cancel()
+            elif not sent.done():
+                sent.set_exception(e)
+                sent.exception()  # Raised here; the packets that joined the batch get it too.
+            raise
 
     # Not implemented.
     # async def read_packet(self) -> Packet
 
     def on_data_reception(self, callback):
-        for id in Bluetooth._ble_devices:
-            device = Bluetooth._ble_devices[id]
-            if device == None:
-                Bluetooth._ble_devices[id] = {'callback': callback, 'can_write': self.can_write}  # TODO: Use constants for the keys.
-                self.id = id
-                break  # TODO: For now it just gets the first one that has not been assigned.
+        self._callback = callback
+        # TODO: For now it just gets the first device that has not been assigned, or the next one added.
+        if Bluetooth._unassigned:
+            self._assign(Bluetooth._unassigned.popleft())
+        else:
+            Bluetooth._waiting.append(self)
+
+    def _assign(self, device_id):
+        Bluetooth._ble_devices[device_id] = {'callback': self._callback, 'can_write': self.can_write}  # TODO: Use constants for the keys.
+        self.id = device_id
 
     # TODO: Evaluate if this will be here, or moved to the robot, specially for the mutlidevice system.
     def stop_program(self):
@@ -0,0 +1,80 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+This is a Brokered class that implements the Backend interface methods for robots whose connection is held
+by the local broker (python -m irobot_edu_sdk.broker), so that programs start without scanning and several
+programs can use the same robot:
+
+    robot = Root(Brokered('ROOT'))
+
+After a one-line handshake naming the robot, the broker's Unix socket carries plain 20-byte packets.
+
+It is compatible with CPython on POSIX systems.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from .backend import Backend
+from .device_cache import user_cache_dir
+from ..packet import Packet
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'irobot_edu_sdk_broker.sock')
+    return os.path.join(user_cache_dir(), 'broker.sock')
+
+
+class Brokered(Backend):
+    def __init__(self, name: str = None, path: Optional[str] = None):
+        """If no name is provided, uses the robot the broker finds first (or already holds for no name).
+        A name starting with /dev/ or COM is a serial port."""
+        self.name = name or ''
+        self.path = path or default_socket_path()
+        self._writer = None
+        self._reader_task = None
+
+    async def connect(self):
+        self._open_rx()
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f'No robot broker at {self.path}; start one with python -m irobot_edu_sdk.broker') from e
+        writer.write(self.name.encode('utf-8') + b'\n')
+        reply = await reader.readline()  # Waits while the broker connects to the robot.
+        if not reply.startswith(b'OK'):
+            writer.close()
+            raise ConnectionError(reply[4:].decode('utf-8').strip() or 'The robot broker closed the connection')
+        self._writer = writer
+        self._reader_task = asyncio.ensure_future(self._read_packets(reader))
+
+    async def _read_packets(self, reader):
+        try:
+            while True:
+                self._deliver(Packet.from_bytes(await reader.readexactly(Packet.PACKET_LEN)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        # The broker lost the robot, or stopped.
+        self._writer = None
+        self._deliver(None)
+
+    async def is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def disconnect(self):
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+    async def write_packet(self, packet: Packet):
+        if self._writer is not None:
+            self._writer.write(packet.to_bytes())
+            await self._writer.drain()
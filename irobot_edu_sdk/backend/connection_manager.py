@@ -0,0 +1,88 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Coordinates the Bluetooth connections of all robots in a program.
+
+Every Bluetooth backend connects through a ConnectionManager (by default the shared `manager`):
+backends that need discovery share one scan, each claiming the first matching robot the others
+have not, and connection attempts run concurrently but never more than `slots` at a time, since
+the adapter can only set up a few connections at once. The rest wait their turn.
+
+    from irobot_edu_sdk.backend.connection_manager import manager
+    manager.slots = 5
+    ...  # create the robots and play()
+    print(manager.connect_times)
+"""
+
+import asyncio
+from time import monotonic
+from typing import Dict, Optional, Set
+
+from .scanner import RobotScanner
+
+
+class ConnectionManager:
+    def __init__(self, slots: int = 4):
+        self.slots = slots
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._scanner: Optional[RobotScanner] = None
+        self._scanning = 0
+        self._claimed: Set[str] = set()
+        self.connect_times: Dict[str, float] = {}  # robot name (or address): seconds from connect() to connected
+        self.scan_times: Dict[str, float] = {}     # robot name (or address): seconds it waited for discovery
+
+    async def connect(self, backend):
+        """Connect backend (a Bluetooth instance), using its cached address, the shared scan and a slot as needed."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.slots)
+        start = monotonic()
+        connected = False
+        if backend._address:
+            self._claimed.add(backend._address)
+            async with self._semaphore:
+                if not await self._connect_claimed(backend, backend._address):
+                    raise ConnectionError(f'Could not connect to {backend._address}')
+            connected = True
+        elif backend._cache is not None:
+            async with self._semaphore:
+                connected = await backend._connect_cached(self._claimed)
+
+        while not connected:  # Like a single robot, keeps looking until one accepts the connection.
+            device, adv = await self._discover(backend)
+            self.scan_times[backend._name or device.address] = monotonic() - start
+            async with self._semaphore:
+                connected = await self._connect_claimed(backend, device.address, device, adv.rssi)
+        self.connect_times[backend._name or backend._address] = monotonic() - start
+
+    async def _connect_claimed(self, backend, address: str, *args) -> bool:
+        """Connect backend to the claimed address, giving up the claim if that fails."""
+        try:
+            if await backend._connect_found(*args):
+                return True
+        except Exception:
+            self._claimed.discard(address)
+            raise
+        self._claimed.discard(address)
+        return False
+
+    async def _discover(self, backend):
+        self._scanning += 1
+        try:
+            if self._scanner is None:
+                self._scanner = RobotScanner()
+            await self._scanner.start()  # Kept running, across finds, until no backend is waiting.
+            return await self._scanner.find(backend._name, rank_window=backend._rank_window, claimed=self._claimed)
+        finally:
+            self._scanning -= 1
+            if not self._scanning and self._scanner is not None:
+                scanner, self._scanner = self._scanner, None
+                await scanner.stop()
+
+    def release(self, address: str):
+        """Allow a disconnected robot to be found by another backend."""
+        self._claimed.discard(address)
+
+
+manager = ConnectionManager()
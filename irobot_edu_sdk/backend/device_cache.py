@@ -0,0 +1,69 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+On-disk cache of the robots a computer has connected to, so that the Bluetooth backend can connect
+straight to a known address instead of scanning first.
+"""
+
+import json
+import os
+import sys
+from time import time
+from typing import Dict, Optional
+
+
+def user_cache_dir() -> str:
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'irobot_edu_sdk')
+
+
+class DeviceCache:
+    """Maps the name a program asked for (or '' for "any robot") to the address, advertised name,
+    last-seen time and RSSI of the robot it last connected to."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(user_cache_dir(), 'ble_devices.json')
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries: Dict[str, dict]):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp = f'{self.path}.{os.getpid()}.tmp'
+            with open(temp, 'w') as f:
+                json.dump(entries, f, indent=1)
+            os.replace(temp, self.path)  # Atomic, so concurrent programs never read half a file.
+        except OSError as e:
+            print(f'Warning: could not update device cache {self.path}: {e}')
+
+    def lookup(self, name: Optional[str]) -> Optional[dict]:
+        return self._load().get(name or '')
+
+    def remember(self, name: Optional[str], address: str, advertised_name: Optional[str] = None,
+                 rssi: Optional[int] = None):
+        entries = self._load()
+        entries[name or ''] = {
+            'address': address,
+            'name': advertised_name or name,
+            'last_seen': time(),
+            'rssi': rssi,
+        }
+        self._save(entries)
+
+    def forget(self, name: Optional[str]):
+        entries = self._load()
+        if entries.pop(name or '', None) is not None:
+            self._save(entries)
@@ -0,0 +1,52 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Incremental parser for the serial framing: each packet is sent as 40 hex digits followed by a newline.
+"""
+
+from ..packet import Packet
+
+FRAME_LEN = 2 * Packet.PACKET_LEN  # hex digits, without the newline
+
+
+class HexFrameParser:
+    """Splits a byte stream into packets. Bytes can be fed in chunks of any size; partial frames
+    are kept until the rest arrives, and lines that are not a valid frame are counted and skipped."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.packets = 0
+        self.errors = 0
+
+    def feed(self, data) -> list:
+        """Add received bytes and return the packets completed by them."""
+        buffer = self._buffer
+        buffer += data
+        packets = []
+        start = 0
+        while True:
+            end = buffer.find(b'\n', start)
+            if end < 0:
+                break
+            # Like the original reader, ignore anything before the last FRAME_LEN digits of a line.
+            if end - start >= FRAME_LEN:
+                try:
+                    packets.append(Packet.from_bytes(bytes.fromhex(buffer[end - FRAME_LEN:end].decode())))
+                except ValueError:
+                    self.errors += 1
+            elif end > start:
+                self.errors += 1
+            start = end + 1
+        if start:
+            del buffer[:start]
+        if len(buffer) > 2 * FRAME_LEN:
+            # Noise without newlines; keep only what could still be the end of a frame.
+            self.errors += 1
+            del buffer[:-FRAME_LEN]
+        self.packets += len(packets)
+        return packets
+
+    def reset(self):
+        self._buffer = bytearray()
@@ -0,0 +1,162 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Wraps a backend in an emulated link with the latency, jitter, bandwidth, loss, duplication, reordering and
+corruption seen in the field, to reproduce them on the bench or against a simulator:
+
+    robot = Root(Impaired(Simulator(), 'crowded_classroom', seed=1))
+    robot = Root(Impaired(Bluetooth(), LinkConditions(latency=0.1, loss=0.05)))
+
+Both directions are impaired independently with the same conditions. Randomness comes from one seeded
+generator, so a run with the same seed and the same traffic sees the same impairments.
+
+A corrupted packet keeps its corrupted bytes, CRC included, all the way: backends that send packets as bytes
+put them on the wire as they are, and the robot (or the Simulator) drops them as it drops line noise.
+write_packet() returns False for a packet whose every copy was lost; since the others reach the backend
+later, what its write_packet() returns for them is not passed back.
+"""
+
+import asyncio
+from random import Random
+from typing import Optional, Union
+
+from .backend import Backend
+from ..packet import Packet
+
+
+class LinkConditions:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[float] = None,
+                 loss: float = 0.0, duplicate: float = 0.0, reorder: float = 0.0, corrupt: float = 0.0):
+        """latency: one-way seconds. jitter: mean extra seconds (exponentially distributed, so with a long tail).
+        bandwidth: packet bytes per second, None for unlimited. loss, duplicate, reorder, corrupt: probability
+        per packet of dropping it, delivering it twice, letting it overtake the packets in flight, or flipping
+        one of its bits (so that its CRC check fails)."""
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.loss = loss
+        self.duplicate = duplicate
+        self.reorder = reorder
+        self.corrupt = corrupt
+
+
+PRESETS = {
+    # A robot next to the computer: a 15 ms connection interval, four packets per interval, nothing lost.
+    'good_ble': LinkConditions(latency=0.015, jitter=0.005, bandwidth=5000),
+    # Thirty robots and phones in one room: retransmissions show up as delay, and some notifications are lost.
+    'crowded_classroom': LinkConditions(latency=0.045, jitter=0.04, bandwidth=1000, loss=0.02, reorder=0.01),
+    # A worn cable or hub: fast, but with line noise and the occasional repeated frame.
+    'flaky_usb': LinkConditions(latency=0.002, jitter=0.001, bandwidth=5600, loss=0.005, duplicate=0.002,
+                                corrupt=0.01),
+}
+
+
+class _Corrupted(Packet):
+    """A packet with bits flipped on the link: serialized with the CRC it arrived with, not a fresh one."""
+
+    def to_bytes(self):
+        return self.packet() + bytes([self.crc])
+
+
+class _Direction:
+    """One way of the link: when packets finish sending and when they arrive."""
+
+    def __init__(self):
+        self.free_at = 0.0     # When the link has sent everything queued.
+        self.last_arrival = 0.0
+        self.packets = 0
+        self.lost = 0
+        self.duplicated = 0
+        self.reordered = 0
+        self.corrupted = 0
+
+
+class Impaired(Backend):
+    def __init__(self, backend: Backend, conditions: Union[str, LinkConditions] = 'good_ble',
+                 seed: Optional[int] = None):
+        """conditions: a LinkConditions, or the name of one of the PRESETS."""
+        self.backend = backend
+        self.conditions = PRESETS[conditions] if isinstance(conditions, str) else conditions
+        self.random = Random(seed)
+        self.to_robot = _Direction()
+        self.from_robot = _Direction()
+        self._reader = None
+
+    async def connect(self):
+        self._open_rx()
+        await self.backend.connect()
+        if self._reader is None:
+            self._reader = asyncio.ensure_future(self._read_packets())
+
+    async def is_connected(self) -> bool:
+        return await self.backend.is_connected()
+
+    async def disconnect(self):
+        await self.backend.disconnect()
+
+    async def write_packet(self, packet: Packet):
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        copies = self._impair(self.to_robot, packet, now)
+        for departure, arrival, copy in copies:
+            if departure > now:
+                await asyncio.sleep(departure - now)  # The sender waits while the link is busy, as with a real one.
+                now = loop.time()
+            loop.call_at(arrival, lambda copy=copy: asyncio.ensure_future(self.backend.write_packet(copy)))
+        return False if not copies else None
+
+    async def _read_packets(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            packet = await self.backend.read_packet()
+            if packet is None:
+                self._deliver(None)  # A dropped connection is not delayed.
+                continue
+            for _, arrival, copy in self._impair(self.from_robot, packet, loop.time()):
+                loop.call_at(arrival, self._deliver, copy)
+
+    def _impair(self, direction: _Direction, packet: Packet, now: float):
+        """(departure, arrival, packet) for each copy of packet that gets through, if any."""
+        conditions = self.conditions
+        random = self.random
+        direction.packets += 1
+        copies = 1
+        if random.random() < conditions.duplicate:
+            direction.duplicated += 1
+            copies = 2
+        impaired = []
+        for _ in range(copies):
+            departure = max(now, direction.free_at)
+            if conditions.bandwidth:
+                departure += Packet.PACKET_LEN / conditions.bandwidth
+            direction.free_at = departure
+            if random.random() < conditions.loss:
+                direction.lost += 1
+                continue
+            if random.random() < conditions.reorder:
+                # Skips the latency: overtakes whatever is still in flight.
+                direction.reordered += 1
+                arrival = departure
+            else:
+                arrival = departure + conditions.latency
+                if conditions.jitter:
+                    arrival += random.expovariate(1 / conditions.jitter)
+                arrival = max(arrival, direction.last_arrival)  # Otherwise the link keeps packets in order.
+                direction.last_arrival = arrival
+            copy = packet
+            if random.random() < conditions.corrupt:
+                direction.corrupted += 1
+                raw = bytearray(packet.packet() + bytes([packet.crc]))  # As sent, with the CRC it came with.
+                bit = random.randrange(Packet.PACKET_LEN * 8)
+                raw[bit // 8] ^= 1 << (bit % 8)
+                copy = _Corrupted(raw[0], raw[1], raw[2], bytes(raw[3:19]), raw[19])
+            impaired.append((departure, arrival, copy))
+        return impaired
+
+    def stats(self) -> dict:
+        """Counts of packets, and of how they were impaired, in each direction."""
+        return {name: {'packets': d.packets, 'lost': d.lost, 'duplicated': d.duplicated,
+                       'reordered': d.reordered, 'corrupted': d.corrupted}
+                for name, d in (('to_robot', self.to_robot), ('from_robot', self.from_robot))}
@@ -0,0 +1,129 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Recording and replay of the packet stream between a program and a robot, in the trace format of trace_file.
+
+    robot = Root(Recorder(Bluetooth(), 'session.trace', compression='zlib'))  # Records everything sent and received.
+    robot = Root(Replay('session.trace'))  # Plays the robot's side back to the same program.
+
+Replay delivers the recorded packets from the robot in step with the program: each recorded write must be
+matched by the program's next write before the packets that followed it are delivered, and writes that
+differ from the recording are counted in mismatches.
+"""
+
+import asyncio
+from typing import List, Optional, Tuple
+
+from .backend import Backend
+from .trace_file import DROP, RX, TX, TraceReader, TraceWriter
+from ..packet import Packet
+
+
+class Recorder(Backend):
+    def __init__(self, backend: Backend, path: str, compression: Optional[str] = None, block_seconds: float = 1.0):
+        """compression: None, 'zlib' or 'lzma'. block_seconds: how often blocks are written and indexed."""
+        self.backend = backend
+        self.trace = TraceWriter(path, compression, block_seconds)
+        self._reader = None
+
+    async def connect(self):
+        self._open_rx()
+        await self.backend.connect()
+        if self._reader is None:
+            self._reader = asyncio.ensure_future(self._read_packets())
+
+    async def is_connected(self) -> bool:
+        return await self.backend.is_connected()
+
+    async def disconnect(self):
+        await self.backend.disconnect()
+        self.trace.flush()
+
+    async def write_packet(self, packet: Packet):
+        self.trace.write(TX, packet)
+        return await self.backend.write_packet(packet)
+
+    async def _read_packets(self):
+        while True:
+            packet = await self.backend.read_packet()
+            if packet is None:
+                if not await self.backend.is_connected():
+                    self.trace.write(DROP, None)
+            else:
+                self.trace.write(RX, packet)
+            self._deliver(packet)
+
+    def close(self):
+        """Finish the trace. Also done when the program exits."""
+        self.trace.close()
+
+
+class Replay(Backend):
+    def __init__(self, path: str, speed: Optional[float] = 1.0, tx_timeout: float = 5.0):
+        """speed: 1 replays in real time, 2 twice as fast, None as fast as possible.
+        tx_timeout: seconds to wait for the program to make a recorded write before going on without it."""
+        self.path = path
+        self.speed = speed
+        self.tx_timeout = tx_timeout
+        self.mismatches: List[Tuple[Optional[Packet], Optional[Packet]]] = []  # (recorded, written); None if missing.
+        self.matched = 0
+        self.finished = None  # Set when the whole trace has been replayed.
+        self._connected = False
+        self._written = None
+        self._feeder = None
+
+    async def connect(self):
+        self._open_rx()
+        self._connected = True
+        if self._feeder is None:  # Reconnecting after a recorded drop goes on from there.
+            self._written = asyncio.Queue()
+            self.finished = asyncio.Event()
+            self._feeder = asyncio.ensure_future(self._feed())
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+
+    async def write_packet(self, packet: Packet):
+        if self._written is None:
+            return False  # Not connected yet: nothing to match it against.
+        self._written.put_nowait(packet)
+
+    async def _feed(self):
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        with TraceReader(self.path) as trace:
+            for t, direction, packet in trace.read():
+                if self.speed:
+                    delay = start + t / self.speed - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if direction == TX:
+                    waited = loop.time()
+                    await self._expect(packet)
+                    start += loop.time() - waited  # The program's own delays do not make the robot hurry.
+                elif direction == RX:
+                    self._deliver(packet)
+                elif direction == DROP:
+                    self._connected = False
+                    self._deliver(None)
+        # Anything the program writes from now on is more than the recording had.
+        while not self._written.empty():
+            self.mismatches.append((None, self._written.get_nowait()))
+        self.finished.set()
+
+    async def _expect(self, recorded: Packet):
+        try:
+            written = await asyncio.wait_for(self._written.get(), self.tx_timeout)
+        except asyncio.TimeoutError:
+            written = None
+        if written is not None and written.to_bytes() == recorded.to_bytes():
+            self.matched += 1
+        else:
+            if not self.mismatches:
+                print(f'Replay: the program wrote {written} where the recording has {recorded}')
+            self.mismatches.append((recorded, written))
@@ -0,0 +1,137 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Streaming Bluetooth discovery of iRobot Education robots, using Bleak's detection callback.
+
+Find one robot, returning as soon as it advertises (or, with rank_window, the strongest one heard
+within that many seconds of the first):
+    device, adv = await RobotScanner().find('ROOT', rank_window=1.0)
+
+List nearby robots with live RSSI, e.g. to pick robots for a fleet:
+    async with RobotScanner() as scanner:
+        await asyncio.sleep(3)
+        for robot in scanner.nearby():
+            print(robot.name, robot.address, robot.rssi)
+"""
+
+import asyncio
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from bleak import BleakScanner
+
+ROOT_ID_SERVICE = "48c5d828-ac2a-442d-97a3-0c9822b04979"
+UART_SERVICE = "6e400001-b5a3-f393-e0a9-e50e24dcca9e"
+
+
+class NearbyRobot:
+    def __init__(self, device, adv):
+        self.device = device
+        self.update(adv)
+
+    def update(self, adv):
+        self.name = self.device.name or adv.local_name
+        self.address = self.device.address
+        self.rssi = adv.rssi
+        self.advertisement = adv
+        self.last_seen = monotonic()
+
+    def __repr__(self):
+        return f'NearbyRobot({self.name!r}, {self.address!r}, rssi={self.rssi})'
+
+
+class RobotScanner:
+    def __init__(self, max_age: float = 10.0):
+        self.max_age = max_age  # nearby() leaves out robots not heard from for this many seconds.
+        self._robots: Dict[str, NearbyRobot] = {}
+        self._listeners: List[Callable[[NearbyRobot], None]] = []
+        self._scanner: Optional[BleakScanner] = None
+
+    def _detected(self, device, adv):
+        if ROOT_ID_SERVICE not in adv.service_uuids:
+            return
+        robot = self._robots.get(device.address)
+        if robot:
+            robot.device = device
+            robot.update(adv)
+        else:
+            robot = self._robots[device.address] = NearbyRobot(device, adv)
+        for listener in list(self._listeners):
+            listener(robot)
+
+    async def start(self):
+        if self._scanner is None:
+            self._scanner = BleakScanner(detection_callback=self._detected,
+                                         service_uuids=[ROOT_ID_SERVICE, UART_SERVICE])
+            await self._scanner.start()
+
+    async def stop(self):
+        if self._scanner is not None:
+            await self._scanner.stop()
+            self._scanner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def nearby(self) -> List[NearbyRobot]:
+        """Robots heard within max_age seconds, strongest signal first."""
+        now = monotonic()
+        robots = [r for r in self._robots.values() if now - r.last_seen <= self.max_age]
+        return sorted(robots, key=lambda r: r.rssi if r.rssi is not None else -999, reverse=True)
+
+    async def find(self, name: Optional[str] = None, timeout: Optional[float] = None,
+                   rank_window: Optional[float] = None, claimed: Optional[Set[str]] = None) -> Optional[Tuple[object, object]]:
+        """(BLEDevice, AdvertisementData) of a robot called name (any robot if None), or None after timeout
+        seconds (never if None). Without rank_window the first match is returned immediately.
+        Addresses in claimed are skipped, and the returned one is added to it, so that concurrent finds
+        on a shared scanner never return the same robot."""
+        loop = asyncio.get_event_loop()
+        found = loop.create_future()
+        matches: Dict[str, NearbyRobot] = {}
+
+        def pick():
+            candidates = [r for r in matches.values() if claimed is None or r.address not in claimed]
+            if found.done():
+                return
+            if not candidates:
+                matches.clear()  # Taken by another find in the meantime; start over.
+                return
+            best = max(candidates, key=lambda r: r.rssi if r.rssi is not None else -999)
+            if claimed is not None:
+                claimed.add(best.address)
+            found.set_result((best.device, best.advertisement))
+
+        def listener(robot: NearbyRobot):
+            if name is not None and robot.name != name:
+                return
+            if claimed is not None and robot.address in claimed:
+                return
+            if not rank_window:
+                matches[robot.address] = robot
+                pick()
+            elif not matches:
+                matches[robot.address] = robot
+                loop.call_later(rank_window, pick)
+            else:
+                matches[robot.address] = robot
+
+        self._listeners.append(listener)
+        started = self._scanner is None
+        try:
+            await self.start()
+            # Robots heard before this call count too.
+            for robot in self.nearby():
+                listener(robot)
+            return await asyncio.wait_for(found, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._listeners.remove(listener)
+            if started:
+                await self.stop()
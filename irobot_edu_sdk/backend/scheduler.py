@@ -0,0 +1,136 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Priority-aware transmit scheduler for backends that can only have one write in flight.
+
+Queued packets are sent one at a time, always draining higher priority classes first, so a
+stop() never waits behind a backlog of getters or light updates: at most one write that is
+already on the air. Packets whose deadline passes while they are queued are dropped instead
+of being sent late. An emergency packet also drops the motion packets queued before it, which
+it would otherwise overtake: a stop must not be followed by the drive command it cancelled.
+
+Only the desktop Bluetooth backend schedules its writes this way, and only its write_packet()
+takes priority and deadline arguments; the Robot methods always use the default classes.
+"""
+
+import asyncio
+from collections import deque
+from enum import IntEnum
+from time import monotonic
+from typing import Awaitable, Callable, Dict, Optional
+
+from ..packet import Packet
+
+
+class Priority(IntEnum):
+    EMERGENCY = 0  # stop/reset, zero wheel speeds
+    MOTION = 1     # motors and marker
+    QUERY = 2      # getters and settings
+    COSMETIC = 3   # lights and sound
+
+
+def classify(packet: Packet) -> Priority:
+    """Default priority class of a packet, from its device and command."""
+    if packet.dev == 0 and packet.cmd == 3:
+        return Priority.EMERGENCY
+    if packet.dev == 1:
+        if packet.cmd == 4 and not any(packet.payload):
+            return Priority.EMERGENCY
+        return Priority.MOTION
+    if packet.dev == 2:
+        return Priority.MOTION
+    if packet.dev in (3, 5):
+        return Priority.COSMETIC
+    return Priority.QUERY
+
+
+class TxScheduler:
+    def __init__(self, send: Callable[[Packet], Awaitable[None]]):
+        self._send = send
+        self._queues = [deque() for _ in Priority]
+        self._drainer: Optional[asyncio.Task] = None
+        self._sent = [0] * len(Priority)
+        self._dropped = [0] * len(Priority)
+        self._wait_total = [0.0] * len(Priority)
+        self._wait_max = [0.0] * len(Priority)
+
+    async def submit(self, packet: Packet, priority: Optional[int] = None, deadline: Optional[float] = None) -> bool:
+        """Queue packet and wait until it is sent. Returns False if it was dropped because it was still
+        queued `deadline` seconds after submission. Priority defaults to classify(packet)."""
+        loop = asyncio.get_event_loop()
+        priority = classify(packet) if priority is None else Priority(priority)
+        queued = monotonic()
+        expires = None if deadline is None else queued + deadline
+        future = loop.create_future()
+        if priority == Priority.EMERGENCY:
+            self._supersede(packet)
+        self._queues[priority].append((packet, queued, expires, future))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = loop.create_task(self._drain())
+        return await future
+
+    def _supersede(self, emergency: Packet):
+        """Drop the queued motion packets emergency cancels: all of them for a stop, the wheel ones for zero speeds."""
+        queue = self._queues[Priority.MOTION]
+        kept = deque()
+        for item in queue:
+            packet, _, _, future = item
+            if emergency.dev == 0 or packet.dev == emergency.dev:
+                self._dropped[Priority.MOTION] += 1
+                if not future.done():
+                    future.set_result(False)
+            else:
+                kept.append(item)
+        self._queues[Priority.MOTION] = kept
+
+    def _pop(self):
+        for priority, queue in enumerate(self._queues):
+            if queue:
+                return priority, queue.popleft()
+        return None, None
+
+    async def _drain(self):
+        while True:
+            priority, item = self._pop()
+            if item is None:
+                return
+            packet, queued, expires, future = item
+            if future.done():  # Submitter was cancelled.
+                continue
+            now = monotonic()
+            if expires is not None and now > expires:
+                self._dropped[priority] += 1
+                future.set_result(False)
+                continue
+
+            wait = now - queued
+            self._wait_total[priority] += wait
+            self._wait_max[priority] = max(self._wait_max[priority], wait)
+            try:
+                await self._send(packet)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self._sent[priority] += 1
+            if not future.done():
+                future.set_result(True)
+
+    def depth(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Queue depth, sent and dropped counts, and mean/max queueing wait (in seconds) per priority class."""
+        stats = {}
+        for priority in Priority:
+            sent = self._sent[priority]
+            stats[priority.name.lower()] = {
+                'depth': len(self._queues[priority]),
+                'sent': sent,
+                'dropped': self._dropped[priority],
+                'mean_wait': self._wait_total[priority] / sent if sent else 0.0,
+                'max_wait': self._wait_max[priority],
+            }
+        return stats
@@ -9,41 +9,213 @@ It is compatible with CPython using pySerial and the MicroPython Unix port using
 """
 
 try:
+    import os
     from asyncio import sleep
+    from asyncio import Event
+    from threading import Event as ThreadEvent, Lock, Thread, current_thread
 except ImportError:
     from uasyncio import sleep
+    Thread = None  # micropython: read_packet() polls the port instead.
 
 from binascii import hexlify, unhexlify
 from serial import Serial as _Serial
 from .backend import Backend
+from .framing import HexFrameParser
 from ..packet import Packet
 
 
 class Serial(Backend):
+    READ_SIZE = 4096
+    TX_HIGH_WATER = 4096  # Queued bytes (about 100 packets) at which write_packet() starts to wait...
+    TX_LOW_WATER = 1024   # ...until the port has drained the queue below this.
+
     def __init__(self, port: str):
         self._serial = _Serial(port, 115200)
+        self._parser = HexFrameParser()
+        self._chunk = bytearray(self.READ_SIZE)
+        self._reader = None  # 'fd' when the port is watched by the event loop, else the reader thread.
+        self._lost = False  # The port failed (e.g. the robot was unplugged) while open.
+        self._tx = bytearray()
+        self._tx_lock = Lock() if Thread else None
+        self._tx_drained = None
+        self._tx_closed = False  # Set when the port closes or fails, so write_packet() stops waiting for it.
+        self._writer = None  # 'fd' while the event loop waits for the port to be writable, else the writer thread.
+        self._tx_ready = None
 
     async def connect(self):
-        self._serial.open()
+        if not await self.is_connected():
+            if self._lost:
+                self._serial.close()
+            self._serial.open()
+        self._lost = False
+        self._tx_closed = False
+        self._start_reader()
 
     async def is_connected(self) -> bool:
         try:
-            return self._serial.isOpen()
+            return self._serial.isOpen() and not self._lost
         except AttributeError:
             return True  # no isOpen() for micropython
 
     async def disconnect(self):
+        self._stop_reader()
+        self._close_tx()
+        self._stop_writer()
+        if self._tx:
+            self._serial.write(bytes(self._tx))  # Last packets, e.g. a stop command.
+            self._tx.clear()
         self._serial.close()
 
     async def read_packet(self) -> Packet:
-        string = b''
-        while not (string.endswith(b'\n') and len(string) > 40):
-            await sleep(0)
-            while not self._serial.inWaiting():
+        if Thread is None:
+            string = b''
+            while not (string.endswith(b'\n') and len(string) > 40):
                 await sleep(0)
-            string += self._serial.read(1)
-        return Packet.from_bytes(unhexlify(string[-41:-1]))
+                while not self._serial.inWaiting():
+                    await sleep(0)
+                string += self._serial.read(1)
+            return Packet.from_bytes(unhexlify(string[-41:-1]))
+        self._start_reader()
+        return await super().read_packet()
+
+    def _start_reader(self):
+        if Thread is None or self._reader is not None:
+            return
+        self._open_rx()
+        self._parser.reset()
+        try:
+            # Have the event loop tell us when the port is readable (POSIX selector loops).
+            self._rx_loop.add_reader(self._serial.fileno(), self._on_readable)
+            self._reader = 'fd'
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            # No file descriptor (Windows) or a loop without add_reader(): block in a thread instead.
+            self._reader = Thread(target=self._read_chunks, daemon=True)
+            self._reader.start()
+
+    def _stop_reader(self):
+        if self._reader == 'fd':
+            self._rx_loop.remove_reader(self._serial.fileno())
+        self._reader = None
+
+    def _on_readable(self):
+        try:
+            count = os.readv(self._serial.fileno(), [self._chunk])
+        except BlockingIOError:
+            return
+        except OSError:
+            count = 0
+        if not count:
+            self._stop_reader()  # Port closed or device unplugged.
+            self._lost = True
+            self._deliver(None)
+            return
+        for packet in self._parser.feed(memoryview(self._chunk)[:count]):
+            self._rx_queue.put_nowait(packet)
+
+    def _read_chunks(self):
+        """Reader thread: blocks until data arrives, then takes everything available in one call.
+        It stops once it is no longer self._reader, so that it leaves alone a reader started after it."""
+        me = current_thread()
+        while self._reader is me:
+            try:
+                data = self._serial.read(self._serial.in_waiting or 1)
+            except Exception:
+                break
+            if self._reader is not me:
+                break  # Replaced while blocked: the data is for the new reader's parser, which was reset.
+            for packet in self._parser.feed(data):
+                self._deliver(packet)
+        if self._reader is me:  # Not stopped by disconnect() or replaced: the port failed.
+            self._reader = None
+            self._lost = True
+            self._deliver(None)
 
     async def write_packet(self, packet: Packet):
         string = hexlify(packet.to_bytes()) + b'\n'
-        self._serial.write(string)
+        if Thread is None:
+            self._serial.write(string)
+            return
+        self._start_reader()
+        while len(self._tx) >= self.TX_HIGH_WATER:
+            if self._tx_closed:
+                raise ConnectionError('The serial port closed while waiting to write')
+            if self._tx_drained is None:
+                self._tx_drained = Event()
+            self._tx_drained.clear()
+            await self._tx_drained.wait()
+        with self._tx_lock:
+            self._tx += string
+        # Packets written before the port is next flushed go out in a single write.
+        if self._reader == 'fd':
+            if self._writer is None:
+                self._rx_loop.add_writer(self._serial.fileno(), self._on_writable)
+                self._writer = 'fd'
+        else:
+            if self._writer is None:
+                self._tx_ready = ThreadEvent()
+                self._writer = Thread(target=self._write_chunks, daemon=True)
+                self._writer.start()
+            self._tx_ready.set()
+
+    def _close_tx(self, from_thread: bool = False):
+        """Wake up the callers waiting for space in the TX buffer, which then raise ConnectionError."""
+        self._tx_closed = True
+        if self._tx_drained is not None:
+            if from_thread:
+                self._rx_loop.call_soon_threadsafe(self._tx_drained.set)
+            else:
+                self._tx_drained.set()
+
+    def _stop_writer(self):
+        writer, self._writer = self._writer, None
+        if writer == 'fd':
+            self._rx_loop.remove_writer(self._serial.fileno())
+        elif writer is not None:
+            self._tx_ready.set()
+            writer.join(1)  # Let it finish the write in progress.
+
+    def _tx_written(self, count: int):
+        with self._tx_lock:
+            del self._tx[:count]
+            remaining = len(self._tx)
+        if remaining < self.TX_LOW_WATER and self._tx_drained is not None:
+            if self._writer == 'fd':
+                self._tx_drained.set()
+            else:
+                self._rx_loop.call_soon_threadsafe(self._tx_drained.set)
+        return remaining
+
+    def _on_writable(self):
+        try:
+            count = os.write(self._serial.fileno(), self._tx)
+        except BlockingIOError:
+            return
+        except OSError:
+            self._tx.clear()  # Port gone; drop what is queued.
+            self._stop_writer()
+            self._lost = True
+            self._close_tx()
+            self._deliver(None)
+            return
+        if not self._tx_written(count):
+            self._stop_writer()
+
+    def _write_chunks(self):
+        """Writer thread: sends everything queued since its last write in one blocking write."""
+        while self._writer is not None:
+            self._tx_ready.wait()
+            self._tx_ready.clear()
+            with self._tx_lock:
+                data = bytes(self._tx)
+            if not data:
+                continue
+            try:
+                self._serial.write(data)
+            except Exception:
+                break  # Port closed.
+            self._tx_written(len(data))
+        if self._writer is not None:  # Not stopped by disconnect(): the port failed.
+            self._writer = None
+            self._lost = True
+            self._close_tx(from_thread=True)
+            self._deliver(None)
@@ -0,0 +1,232 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Serial hub for many robots attached over USB serial, e.g. in a charging bay or on a test bench.
+
+A single thread waits on every port with one selector (epoll on Linux), reads whatever is
+available from each ready port, splits it into frames with a parser per port, and hands the
+packets of all ports to the program's loop with one wakeup per round:
+
+    hub = SerialHub()
+    robots = [Root(hub.port(path)) for path in glob('/dev/ttyACM*')]
+
+POSIX only; needs pySerial to configure the ports.
+"""
+
+import asyncio
+import os
+import selectors
+from binascii import hexlify
+from collections import deque
+from threading import Lock, Thread
+from typing import Dict
+
+from serial import Serial as _Serial
+from .backend import Backend
+from .serial import Serial
+from .framing import HexFrameParser
+from ..packet import Packet
+
+
+class SerialHub:
+    READ_SIZE = 4096
+
+    def __init__(self, baudrate: int = 115200):
+        self.baudrate = baudrate
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._ports: Dict[str, 'HubPort'] = {}
+        self._changes = deque()  # (port, events) for the hub thread to apply; 0 closes the port.
+        self._ready = deque()    # Ports with received packets not yet handed over.
+        self._handover_pending = False
+        self._chunk = bytearray(self.READ_SIZE)
+        self._loop = None
+        self._thread = None
+        self.rounds = 0     # Selector wakeups.
+        self.handovers = 0  # Wakeups of the program's loop.
+
+    def port(self, path: str) -> 'HubPort':
+        """The backend for the robot on serial port path."""
+        if path not in self._ports:
+            self._ports[path] = HubPort(self, path)
+        return self._ports[path]
+
+    def _start(self, loop):
+        if self._thread is None:
+            self._loop = loop
+            self._thread = Thread(target=self._run, name='irobot-serial-hub', daemon=True)
+            self._thread.start()
+
+    def _update(self, port: 'HubPort', events: int):
+        """Change what the hub waits for on port, from any thread."""
+        self._changes.append((port, events))
+        try:
+            os.write(self._wake_w, b'.')
+        except BlockingIOError:
+            pass  # Already woken.
+
+    def _apply(self, port: 'HubPort', events: int):
+        try:
+            if events:
+                try:
+                    self._selector.modify(port._fd, events, port)
+                except KeyError:
+                    self._selector.register(port._fd, events, port)
+            else:
+                self._selector.unregister(port._fd)
+        except (KeyError, ValueError, OSError):
+            pass
+        if not events:
+            port._close()
+
+    def _run(self):
+        while True:
+            self.rounds += 1
+            for key, mask in self._selector.select():
+                port = key.data
+                if port is None:
+                    try:
+                        os.read(self._wake_r, 4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                if mask & selectors.EVENT_READ:
+                    port._on_readable(self._chunk)
+                if mask & selectors.EVENT_WRITE and port._fd is not None:
+                    port._on_writable()
+            while self._changes:
+                self._apply(*self._changes.popleft())
+            if self._ready and not self._handover_pending:
+                self._handover_pending = True
+                self._loop.call_soon_threadsafe(self._hand_over)
+
+    def _hand_over(self):
+        """Runs on the program's loop: queue the packets every port received since the last handover."""
+        self._handover_pending = False
+        self.handovers += 1
+        while self._ready:
+            self._ready.popleft()._hand_over()
+
+
+class HubPort(Backend):
+    def __init__(self, hub: SerialHub, path: str):
+        self._hub = hub
+        self.path = path
+        self._serial = None
+        self._fd = None
+        self._parser = HexFrameParser()
+        self._received = deque()
+        self._queued = False  # In hub._ready.
+        self._tx = bytearray()
+        self._tx_lock = Lock()
+        self._tx_drained = None
+        self._tx_closed = False  # Set when the port closes, so write_packet() stops waiting for it.
+        self._lost = False
+        self._closed = None  # Future resolved by the hub thread once disconnect() has closed the port.
+
+    async def connect(self):
+        self._open_rx()
+        if self._serial is None or not self._serial.isOpen():
+            self._serial = _Serial(self.path, self._hub.baudrate, timeout=0)
+            self._parser.reset()
+        self._lost = False
+        self._tx_closed = False
+        self._fd = self._serial.fileno()
+        self._hub._start(self._rx_loop)
+        self._hub._update(self, selectors.EVENT_READ)
+
+    async def is_connected(self) -> bool:
+        return self._serial is not None and self._serial.isOpen() and not self._lost
+
+    async def disconnect(self):
+        if self._fd is not None:
+            closed = self._closed = self._rx_loop.create_future()
+            self._hub._update(self, 0)
+            await closed
+
+    async def write_packet(self, packet: Packet):
+        if self._fd is None:
+            return  # Port closed or lost.
+        # Same backpressure as Serial: wait while the port is far behind.
+        while len(self._tx) >= Serial.TX_HIGH_WATER:
+            if self._tx_drained is None:
+                self._tx_drained = asyncio.Event()
+            self._tx_drained.clear()
+            await self._tx_drained.wait()
+            if self._tx_closed:
+                raise ConnectionError('The serial port closed while waiting to write')
+        frame = hexlify(packet.to_bytes()) + b'\n'
+        with self._tx_lock:  # The hub thread closes the port under it.
+            if self._fd is None:
+                return
+            if not self._tx:
+                try:
+                    written = os.write(self._fd, frame)
+                except BlockingIOError:
+                    written = 0
+                if written == len(frame):
+                    return
+                frame = frame[written:]
+            self._tx += frame
+        # The port is full; the hub thread sends the rest when it becomes writable.
+        self._hub._update(self, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+    # Called on the hub thread.
+
+    def _on_readable(self, chunk: bytearray):
+        try:
+            count = os.readv(self._fd, [chunk])
+        except BlockingIOError:
+            return
+        except OSError:
+            count = 0
+        if count:
+            self._received.extend(self._parser.feed(memoryview(chunk)[:count]))
+        else:
+            # Unplugged: stop watching the port and wake the reader.
+            self._lost = True
+            self._hub._apply(self, 0)
+            self._received.append(None)
+        if self._received and not self._queued:
+            self._queued = True
+            self._hub._ready.append(self)
+
+    def _on_writable(self):
+        with self._tx_lock:
+            try:
+                written = os.write(self._fd, self._tx)
+            except BlockingIOError:
+                return
+            except OSError:
+                written = len(self._tx)
+            del self._tx[:written]
+            remaining = len(self._tx)
+        if remaining < Serial.TX_LOW_WATER and self._tx_drained is not None:
+            self._rx_loop.call_soon_threadsafe(self._tx_drained.set)
+        if not remaining:
+            self._hub._apply(self, selectors.EVENT_READ)
+
+    def _close(self):
+        with self._tx_lock:
+            if self._serial is not None:
+                self._serial.close()
+            self._fd = None
+            self._tx.clear()
+            self._tx_closed = True
+        if self._tx_drained is not None:
+            self._rx_loop.call_soon_threadsafe(self._tx_drained.set)  # Blocked writers raise ConnectionError.
+        if self._closed is not None:
+            self._rx_loop.call_soon_threadsafe(self._closed.set_result, None)
+            self._closed = None
+
+    # Called on the program's loop.
+
+    def _hand_over(self):
+        self._queued = False
+        while self._received:
+            self._rx_queue.put_nowait(self._received.popleft())
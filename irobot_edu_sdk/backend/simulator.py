@@ -0,0 +1,162 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+This is a headless simulated robot that implements the Backend interface methods, for tests, benchmarks
+and network bridges without hardware. Like the Turtle backend it is incomplete: it answers motion,
+position, marker, name, version, battery, accelerometer and note commands, and sends no events.
+
+It is compatible with any CPython installation.
+"""
+
+from math import cos, sin, radians, degrees
+from struct import pack, unpack
+from time import monotonic
+from typing import Optional
+
+from .backend import Backend
+from ..getter_types import Pose
+from ..packet import Packet
+
+
+class Simulator(Backend):
+    def __init__(self, name: str = 'Simulator', latency: float = 0.0, speed: Optional[float] = None,
+                 wheel_base: float = 23.5):
+        """latency: seconds before each response. speed: cm/s at which drive commands complete
+        (None: instantly). wheel_base: cm, for integrating wheel speeds set with set_wheel_speeds()."""
+        self.name = name
+        self.latency = latency
+        self.speed = speed
+        self.wheel_base = wheel_base
+        self.pose = Pose()
+        self.marker = 0
+        self.lights = bytes(4)
+        self.unsupported = 0
+        self._connected = False
+        self._start = monotonic()
+        self._wheels = (0.0, 0.0, monotonic())  # left, right cm/s, and when they were set
+        self._enabled_events = bytes([0xFF] * 16)
+
+    async def connect(self):
+        self._open_rx()
+        self._connected = True
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+
+    def _timestamp(self) -> int:
+        return int((monotonic() - self._start) * 1000) & 0xFFFFFFFF
+
+    def _respond(self, packet: Packet, payload: bytes, delay: float = 0.0):
+        response = Packet(packet.dev, packet.cmd, packet.inc, payload, force_crc=True)
+        self._rx_loop.call_later(self.latency + delay, self._deliver, response)
+
+    def _pose_payload(self) -> bytes:
+        return pack('>Iiih', self._timestamp(), int(self.pose.x * 10), int(self.pose.y * 10),
+                    int(self.pose.heading * 10) % 3600)
+
+    def _integrate_wheels(self, left: float = 0.0, right: float = 0.0):
+        """Move the pose by the wheel speeds in effect since they were set, then set new ones."""
+        old_left, old_right, since = self._wheels
+        now = monotonic()
+        dt = now - since
+        if old_left == old_right:
+            self.pose.move(old_left * dt)
+        else:
+            v = (old_left + old_right) / 2
+            w = (old_right - old_left) / self.wheel_base  # rad/s, counter-clockwise
+            heading = radians(self.pose.heading)
+            r = v / w
+            self.pose.x += r * (sin(heading + w * dt) - sin(heading))
+            self.pose.y -= r * (cos(heading + w * dt) - cos(heading))
+            self.pose.heading = (self.pose.heading + degrees(w * dt)) % 360
+        self._wheels = (left, right, now)
+
+    def _drive_time(self, distance: float) -> float:
+        return abs(distance) / self.speed if self.speed else 0.0
+
+    async def write_packet(self, packet: Packet):
+        if not self._connected:
+            return
+        if packet._crc is not None and not packet.check_crc():
+            return  # Corrupted on the way (packets made by a program have no CRC until serialized).
+        dev, cmd, payload = packet.dev, packet.cmd, packet.payload
+
+        if dev == 0:
+            if cmd == 0:  # Get versions
+                self._respond(packet, bytes([payload[0], 3, 0, 1, 0, 0, 0, 1, 7, 0]))
+            elif cmd == 1:  # Set name
+                self.name = payload.decode('utf-8').rstrip('\0')
+            elif cmd == 2:  # Get name
+                self._respond(packet, self.name.encode('utf-8')[:Packet.PAYLOAD_LEN])
+            elif cmd == 3:  # Stop and reset
+                self._integrate_wheels()
+            elif cmd == 7:  # Enable events
+                self._enabled_events = bytes(a | b for a, b in zip(self._enabled_events, payload))
+            elif cmd == 9:  # Disable events
+                self._enabled_events = bytes(a & ~b & 0xFF for a, b in zip(self._enabled_events, payload))
+            elif cmd == 11:  # Get enabled events
+                self._respond(packet, self._enabled_events)
+            else:
+                self.unsupported += 1
+
+        elif dev == 1:
+            if cmd == 4:  # Set left and right motor speed
+                left, right = unpack('>ii', payload[0:8])
+                self._integrate_wheels(left / 10, right / 10)
+            elif cmd == 6:  # Set left motor speed
+                self._integrate_wheels(unpack('>i', payload[0:4])[0] / 10, self._wheels[1])
+            elif cmd == 7:  # Set right motor speed
+                self._integrate_wheels(self._wheels[0], unpack('>i', payload[0:4])[0] / 10)
+            elif cmd == 8:  # Drive distance
+                self._integrate_wheels()
+                distance = unpack('>i', payload[0:4])[0] / 10
+                self.pose.move(distance)
+                self._respond(packet, self._pose_payload(), self._drive_time(distance))
+            elif cmd == 12:  # Rotate angle (clockwise)
+                self._integrate_wheels()
+                angle = unpack('>i', payload[0:4])[0] / 10
+                self.pose.turn_left(-angle)
+                self._respond(packet, self._pose_payload(), self._drive_time(radians(angle) * self.wheel_base / 2))
+            elif cmd == 15:  # Reset position
+                self._integrate_wheels()
+                self.pose = Pose()
+            elif cmd == 16:  # Get position
+                self._integrate_wheels(*self._wheels[:2])
+                self._respond(packet, self._pose_payload())
+            elif cmd == 17:  # Navigate to position
+                self._integrate_wheels()
+                x, y, heading = unpack('>iih', payload[0:10])
+                distance = ((x / 10 - self.pose.x) ** 2 + (y / 10 - self.pose.y) ** 2) ** 0.5
+                self.pose.set(x / 10, y / 10, heading / 10 if heading >= 0 else self.pose.heading)
+                self._respond(packet, self._pose_payload(), self._drive_time(distance))
+            elif cmd == 27:  # Drive arc
+                self._integrate_wheels()
+                angle, radius = unpack('>ii', payload[0:8])
+                self.pose.arc(angle / 10, radius / 10)
+                self._respond(packet, self._pose_payload(), self._drive_time(radians(angle / 10) * radius / 10))
+            else:
+                self.unsupported += 1
+
+        elif dev == 2 and cmd == 0:  # Set marker/eraser position
+            self.marker = payload[0]
+            self._respond(packet, payload)
+
+        elif dev == 3 and cmd == 2:  # Set LED animation
+            self.lights = payload[0:4]
+
+        elif dev == 5 and cmd == 0:  # Play note
+            self._respond(packet, payload, unpack('>H', payload[4:6])[0] / 1000 if self.speed else 0.0)
+
+        elif dev == 14 and cmd == 1:  # Get battery level
+            self._respond(packet, pack('>IHB', self._timestamp(), 16000, 100))
+
+        elif dev == 16 and cmd == 1:  # Get accelerometer
+            self._respond(packet, pack('>Ihhh', self._timestamp(), 0, 0, 1000))
+
+        else:
+            self.unsupported += 1
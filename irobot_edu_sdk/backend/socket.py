@@ -0,0 +1,172 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+This is a network Socket class that implements the Backend interface methods, for robots served by a
+bridge (see irobot_edu_sdk.bridge) over TCP or UDP.
+
+Each frame is one byte with the robot's channel on the bridge followed by the 20-byte packet; frames
+have a fixed size, so there is no length prefix. Backends for robots on the same bridge share one
+TCP connection (or UDP socket), and received frames are routed to them by channel.
+
+It is compatible with CPython.
+"""
+
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from .backend import Backend
+from ..packet import Packet
+
+DEFAULT_PORT = 8484
+FRAME_LEN = 1 + Packet.PACKET_LEN
+
+
+def frame(channel: int, packet: Packet) -> bytes:
+    """The frame for packet, with the CRC it was received with, if any: a relayed packet keeps a failed check."""
+    if not 0 <= channel <= 255:
+        raise ValueError(f'channel must be 0-255, not {channel}')
+    return bytes([channel]) + packet.packet() + bytes([packet.crc])
+
+
+class FrameSplitter:
+    """Splits a TCP byte stream or a UDP datagram into (channel, packet) frames."""
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        count = len(buffer) // FRAME_LEN
+        frames = [(buffer[i * FRAME_LEN], Packet.from_bytes(bytes(buffer[i * FRAME_LEN + 1:(i + 1) * FRAME_LEN])))
+                  for i in range(count)]
+        del buffer[:count * FRAME_LEN]
+        return frames
+
+
+class _Pool(asyncio.Protocol, asyncio.DatagramProtocol):
+    """One TCP connection or UDP socket to a bridge, shared by the Socket backends of its robots."""
+
+    def __init__(self, host: str, port: int, transport: str):
+        self.host = host
+        self.port = port
+        self.kind = transport
+        self.connected = False
+        self._transport = None
+        self._channels: Dict[int, 'Socket'] = {}
+        self._splitter = FrameSplitter()
+        self._opening: Optional[asyncio.Future] = None
+        self._can_write: Optional[asyncio.Event] = None
+
+    async def attach(self, backend: 'Socket'):
+        other = self._channels.get(backend.channel)
+        if other is not None and other is not backend:
+            raise ValueError(f'Channel {backend.channel} of {self.host}:{self.port} is already in use')
+        self._channels[backend.channel] = backend
+        if self.connected:
+            return
+        # Backends connecting at the same time wait for the same connection.
+        if self._opening is None or self._opening.done():
+            self._opening = asyncio.ensure_future(self._open())
+        try:
+            await asyncio.shield(self._opening)
+        except Exception:
+            del self._channels[backend.channel]
+            raise
+
+    async def _open(self):
+        loop = asyncio.get_event_loop()
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+        if self.kind == 'udp':
+            await loop.create_datagram_endpoint(lambda: self, remote_addr=(self.host, self.port))
+        else:
+            await loop.create_connection(lambda: self, self.host, self.port)
+
+    async def detach(self, backend: 'Socket'):
+        if self._channels.get(backend.channel) is backend:
+            del self._channels[backend.channel]
+        if not self._channels and self._transport is not None:
+            self._transport.close()
+
+    async def send(self, channel: int, packet: Packet):
+        if not self.connected:
+            return
+        if self.kind == 'udp':
+            self._transport.sendto(frame(channel, packet))
+        else:
+            await self._can_write.wait()  # The bridge is not keeping up.
+            self._transport.write(frame(channel, packet))
+
+    def connection_made(self, transport):
+        self._transport = transport
+        self.connected = True
+
+    def data_received(self, data):
+        self._route(data)
+
+    def datagram_received(self, data, addr):
+        self._route(data, FrameSplitter())  # Each datagram on its own: a truncated one must not shift the next.
+
+    def _route(self, data, splitter: Optional[FrameSplitter] = None):
+        for channel, packet in (splitter or self._splitter).feed(data):
+            backend = self._channels.get(channel)
+            if backend is not None:
+                backend._deliver(packet)
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    def error_received(self, exc):
+        pass  # UDP: e.g. the bridge is not up (yet); frames are simply lost, as datagrams can be.
+
+    def connection_lost(self, exc):
+        self.connected = False
+        self._transport = None
+        self._splitter = FrameSplitter()
+        if self._can_write is not None:
+            self._can_write.set()
+        for backend in self._channels.values():
+            backend._deliver(None)
+
+
+_pools: Dict[Tuple[str, int, str], _Pool] = {}
+
+
+class Socket(Backend):
+    def __init__(self, host: str, port: int = DEFAULT_PORT, channel: int = 0, transport: str = 'tcp'):
+        """Robot on channel (0-255) of the bridge at host:port, over transport 'tcp' or 'udp'.
+        UDP has less latency but no delivery guarantee; use it on a local network."""
+        if transport not in ('tcp', 'udp'):
+            raise ValueError(f"transport must be 'tcp' or 'udp', not {transport!r}")
+        if not 0 <= channel <= 255:
+            raise ValueError(f'channel must be 0-255, not {channel}')
+        self.host = host
+        self.port = port
+        self.channel = channel
+        self.transport = transport
+        self._pool: Optional[_Pool] = None
+
+    async def connect(self):
+        self._open_rx()
+        key = (self.host, self.port, self.transport)
+        if key not in _pools or (not _pools[key].connected and not _pools[key]._channels):
+            _pools[key] = _Pool(*key)
+        self._pool = _pools[key]
+        await self._pool.attach(self)
+
+    async def is_connected(self) -> bool:
+        return self._pool is not None and self._pool.connected
+
+    async def disconnect(self):
+        if self._pool is not None:
+            await self._pool.detach(self)
+            self._pool = None
+
+    async def write_packet(self, packet: Packet):
+        if self._pool is not None:
+            await self._pool.send(self.channel, packet)
@@ -0,0 +1,119 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Runs a backend's I/O on a dedicated thread with its own event loop.
+
+Normally packet I/O, user event handlers and timers share one loop, so a slow handler delays
+reception for every robot. Wrapped in Threaded, a backend connects, reads, writes and checks
+packet CRCs on an I/O thread; received packets are handed to the program's loop in batches,
+one wakeup for however many arrived meanwhile, where they complete responses and run handlers
+as usual. On multi-core boards like the Raspberry Pi the I/O runs on another core.
+
+    robot = Root(Threaded(Bluetooth('ROOT')))
+
+Backends share one I/O thread unless given their own: Threaded(backend, IoThread()).
+"""
+
+import asyncio
+from collections import deque
+from threading import Thread
+from typing import Optional
+
+from .backend import Backend
+from ..packet import Packet
+
+
+class IoThread:
+    def __init__(self, name: str = 'irobot-io'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro) -> asyncio.Future:
+        """Run coro on the I/O loop; the returned future belongs to the calling loop."""
+        return asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+_shared: Optional[IoThread] = None
+
+
+def shared_io_thread() -> IoThread:
+    global _shared
+    if _shared is None:
+        _shared = IoThread()
+    return _shared
+
+
+class Threaded(Backend):
+    def __init__(self, backend: Backend, io_thread: Optional[IoThread] = None):
+        self.backend = backend
+        self._io = io_thread or shared_io_thread()
+        self._connected = False
+        self._batch = deque()
+        self._handover_pending = False
+        self._reader = None
+        self.batches = 0  # Handovers to the program's loop; packets_received / batches is the mean batch size.
+        self.packets_received = 0
+
+    async def connect(self):
+        self._open_rx()
+        await self._io.submit(self.backend.connect())
+        self._connected = True
+        if self._reader is None:
+            self._reader = self._io.submit(self._read_packets())
+
+    async def is_connected(self) -> bool:
+        return self._connected
+
+    async def disconnect(self):
+        self._connected = False
+        await self._io.submit(self.backend.disconnect())
+
+    async def write_packet(self, packet: Packet, **kwargs):
+        return await self._io.submit(self.backend.write_packet(packet, **kwargs))
+
+    async def _read_packets(self):
+        """Runs on the I/O loop for the lifetime of the backend."""
+        try:
+            while True:
+                packet = await self.backend.read_packet()
+                if packet is None:
+                    self._connected = await self.backend.is_connected()
+                elif not packet.check_crc():
+                    continue  # Bad packets never reach the program's loop; good ones are not checked again.
+                self._queue(packet)
+        except Exception as e:
+            print(f'Warning: reading from {type(self.backend).__name__} failed: {e}')
+        finally:
+            # Reported as a lost connection; the next connect() starts a new reader.
+            self._reader = None
+            self._connected = False
+            self._queue(None)
+
+    def _queue(self, packet: Optional[Packet]):
+        self._batch.append(packet)
+        if not self._handover_pending:
+            self._handover_pending = True
+            try:
+                self._rx_loop.call_soon_threadsafe(self._hand_over)
+            except RuntimeError:
+                pass  # The program's loop has closed.
+
+    def _hand_over(self):
+        """Runs on the program's loop: queue everything received since the last handover."""
+        self._handover_pending = False
+        self.batches += 1
+        while self._batch:
+            packet = self._batch.popleft()
+            if packet is not None:
+                self.packets_received += 1
+            self._rx_queue.put_nowait(packet)
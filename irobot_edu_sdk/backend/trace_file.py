@@ -0,0 +1,204 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Binary packet trace files, as written by the Recorder backend and read by Replay and python -m irobot_edu_sdk.trace.
+
+A trace is append-only: a header, then blocks of records, then (once closed) an index of the blocks.
+
+    header  <4sBBHd   b'IRTR', version, compression (0 none, 1 zlib, 2 lzma), 0, wall clock time at start
+    block   <4sQIII   b'IRTB', block start in ns since the trace started, record count, raw and stored
+                      payload sizes; then the payload, compressed or not
+    record  <IB20s    us since the block started, direction (TX, RX or DROP), packet (zeros for DROP)
+    index   <QQI      per block: start ns, file offset, record count
+    trailer <QI4s     index offset, block count, b'IRTI'
+
+A new block starts every block_seconds, so the index locates any moment of a multi-hour capture in one
+bisection. A trace whose writer did not close it has no index; readers then walk the block headers,
+which costs one read per block, not per record. Uncompressed traces are read straight from a memory map.
+"""
+
+import atexit
+import mmap
+import os
+import struct
+from bisect import bisect_right
+from time import monotonic_ns, time
+from typing import Iterator, List, Optional, Tuple
+
+from ..packet import Packet
+
+TX = 0    # Program to robot.
+RX = 1    # Robot to program.
+DROP = 2  # The connection dropped.
+
+HEADER = struct.Struct('<4sBBHd')
+BLOCK = struct.Struct('<4sQIII')
+RECORD = struct.Struct('<IB20s')
+INDEX_ENTRY = struct.Struct('<QQI')
+TRAILER = struct.Struct('<QI4s')
+VERSION = 1
+COMPRESSION = {None: 0, 'zlib': 1, 'lzma': 2}
+NO_PACKET = bytes(Packet.PACKET_LEN)
+
+
+def _codec(compression: int):
+    if compression == 1:
+        import zlib
+        return zlib
+    if compression == 2:
+        import lzma
+        return lzma
+    return None
+
+
+class TraceWriter:
+    def __init__(self, path: str, compression: Optional[str] = None, block_seconds: float = 1.0,
+                 block_records: int = 4096):
+        """compression: None, 'zlib' or 'lzma'. A block is written every block_seconds or block_records records."""
+        if compression not in COMPRESSION:
+            raise ValueError(f"compression must be None, 'zlib' or 'lzma', not {compression!r}")
+        self.path = path
+        self._compression = COMPRESSION[compression]
+        self._codec = _codec(self._compression)
+        self._block_ns = int(block_seconds * 1e9)
+        if not 0 < self._block_ns < 2 ** 32 * 1000:
+            raise ValueError('block_seconds must be positive and under 4294 s')
+        self._block_records = block_records
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(b'IRTR', VERSION, self._compression, 0, time()))
+        self._start = monotonic_ns()
+        self._index: List[Tuple[int, int, int]] = []
+        self._records = bytearray()
+        self._count = 0
+        self._block_start = 0
+        atexit.register(self.close)  # Keep the index when the program exits without closing the trace.
+
+    def write(self, direction: int, packet: Optional[Packet]):
+        now = monotonic_ns() - self._start
+        if self._count and (now - self._block_start >= self._block_ns or self._count >= self._block_records):
+            self.flush()
+        if not self._count:
+            self._block_start = now
+        # The CRC as received, not recomputed: a trace should show corrupted packets as they were.
+        raw = NO_PACKET if packet is None else packet.packet() + bytes([packet.crc])
+        self._records += RECORD.pack((now - self._block_start) // 1000, direction, raw)
+        self._count += 1
+
+    def flush(self):
+        """Write the records so far as a block."""
+        if not self._count or self._file is None:
+            return
+        raw = bytes(self._records)
+        stored = self._codec.compress(raw) if self._codec else raw
+        self._index.append((self._block_start, self._file.tell(), self._count))
+        self._file.write(BLOCK.pack(b'IRTB', self._block_start, self._count, len(raw), len(stored)))
+        self._file.write(stored)
+        self._file.flush()
+        self._records.clear()
+        self._count = 0
+
+    def close(self):
+        if self._file is None:
+            return
+        self.flush()
+        offset = self._file.tell()
+        for entry in self._index:
+            self._file.write(INDEX_ENTRY.pack(*entry))
+        self._file.write(TRAILER.pack(offset, len(self._index), b'IRTI'))
+        self._file.close()
+        self._file = None
+        atexit.unregister(self.close)
+
+
+class TraceReader:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            raise ValueError(f'{path} is not a packet trace')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.compression, _, self.wall_start = HEADER.unpack_from(self._data, 0)
+        if magic != b'IRTR' or version != VERSION:
+            raise ValueError(f'{path} is not a version {VERSION} packet trace')
+        self._codec = _codec(self.compression)
+        self.complete, self.blocks = self._read_index(size)  # (start ns, offset, records) per block.
+        self._starts = [start for start, _, _ in self.blocks]
+
+    def _read_index(self, size: int):
+        if size >= HEADER.size + TRAILER.size:
+            offset, count, magic = TRAILER.unpack_from(self._data, size - TRAILER.size)
+            if magic == b'IRTI' and offset + count * INDEX_ENTRY.size + TRAILER.size == size:
+                return True, [INDEX_ENTRY.unpack_from(self._data, offset + i * INDEX_ENTRY.size) for i in range(count)]
+        # Not closed: walk the block headers, up to the first incomplete block.
+        blocks = []
+        offset = HEADER.size
+        while offset + BLOCK.size <= size:
+            magic, start, records, _, stored = BLOCK.unpack_from(self._data, offset)
+            if magic != b'IRTB' or offset + BLOCK.size + stored > size:
+                break
+            blocks.append((start, offset, records))
+            offset += BLOCK.size + stored
+        return False, blocks
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def records(self) -> int:
+        return sum(records for _, _, records in self.blocks)
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the start of the trace to its last record."""
+        if not self.blocks:
+            return 0.0
+        start = self.blocks[-1][0]
+        last = 0
+        for offset, _, _ in self._block_records(len(self.blocks) - 1):
+            last = offset
+        return (start + last * 1000) / 1e9
+
+    def _block_payload(self, i: int):
+        _, offset, _ = self.blocks[i]
+        _, _, _, raw, stored = BLOCK.unpack_from(self._data, offset)
+        payload = self._data[offset + BLOCK.size:offset + BLOCK.size + stored]
+        return self._codec.decompress(payload) if self._codec else payload
+
+    def _block_records(self, i: int):
+        """(us since the block started, direction, packet bytes) for each record of block i."""
+        return RECORD.iter_unpack(self._block_payload(i))
+
+    def read(self, start: float = 0.0, end: Optional[float] = None) -> Iterator[Tuple[float, int, Optional[Packet]]]:
+        """(seconds since the trace started, direction, packet or None for DROP) for the records from start to end."""
+        start_ns = int(start * 1e9)
+        end_ns = None if end is None else int(end * 1e9)
+        first = max(bisect_right(self._starts, start_ns) - 1, 0)
+        for i in range(first, len(self.blocks)):
+            block_start = self.blocks[i][0]
+            if end_ns is not None and block_start > end_ns:
+                return
+            for offset, direction, raw in self._block_records(i):
+                t = block_start + offset * 1000
+                if t < start_ns:
+                    continue
+                if end_ns is not None and t > end_ns:
+                    return
+                yield t / 1e9, direction, None if direction == DROP else Packet.from_bytes(raw)
+
+    def raw_blocks(self, start: float = 0.0, end: Optional[float] = None) -> Iterator[Tuple[int, bytes]]:
+        """(start ns, records payload) per block that can hold records from start to end seconds,
+        for tools that decode records in bulk."""
+        first = max(bisect_right(self._starts, int(start * 1e9)) - 1, 0)
+        last = len(self.blocks) if end is None else bisect_right(self._starts, int(end * 1e9))
+        for i in range(first, last):
+            yield self.blocks[i][0], self._block_payload(i)
@@ -8,8 +8,7 @@ This is a Turtle class that implements the Backend interface methods. It is very
 It is compatible with any Python installation which also supports the Python Turtle graphics class.
 """
 
-from asyncio import sleep, Lock
-from queue import SimpleQueue
+from asyncio import Lock
 from .backend import Backend
 from ..packet import Packet
 
@@ -30,12 +29,12 @@ class Turtle(Backend):
             self._name = ''.join(random.choice(string.ascii_lowercase) for _ in range(8))
 
         self._txlock = Lock()
-        self._queue: SimpleQueue = SimpleQueue()
         self._connected = False
         print("WARNING: THE TURTLEBACKEND DOESN'T SUPPORT MOST COMMANDS AND IS IN ALPHA!!")
 
     async def connect(self):
         """This method does not exit until a robot is found"""
+        self._open_rx()
 
         turtle.clearscreen()
         turtle.speed('slow')
@@ -53,11 +52,6 @@ class Turtle(Backend):
     async def disconnect(self):
         self._connected = False
 
-    async def read_packet(self) -> Packet:
-        while self._queue.empty():
-            await sleep(0)
-        return self._queue.get()
-
     async def write_packet(self, packet: Packet):
         if self._connected:
             async with self._txlock:
@@ -101,7 +95,7 @@ class Turtle(Backend):
                         print("Unsupported motor command", packet.cmd)
                     if send_motor_response:
                         #TODO: Calulate robot pose internally instead of using world pose in order to more realistically model bias and offset
-                        self._queue.put(Packet(packet.dev, packet.cmd, packet.inc, pack('>iiih', 0, int(turtle.xcor()*10/self.DIST_SCALE), int(turtle.ycor()*10/self.DIST_SCALE), int(turtle.heading()*10)), force_crc=True))
+                        self._deliver(Packet(packet.dev, packet.cmd, packet.inc, pack('>iiih', 0, int(turtle.xcor()*10/self.DIST_SCALE), int(turtle.ycor()*10/self.DIST_SCALE), int(turtle.heading()*10)), force_crc=True))
 
                 elif packet.dev == 2: # Marker / Eraser
                     if packet.cmd == 0:
@@ -115,7 +109,7 @@ class Turtle(Backend):
                             # TODO: improve eraser
                         else:
                                 print("Unexpected marker/eraser position", packet.payload[0])
-                        self._queue.put(Packet(packet.dev, packet.cmd, packet.inc, packet.payload, force_crc=True))
+                        self._deliver(Packet(packet.dev, packet.cmd, packet.inc, packet.payload, force_crc=True))
                     else:
                         print("Unexpected marker/eraser command", packet.cmd)
 
@@ -8,7 +8,7 @@ This is a USB class that implements the Backend interface methods.
 It is only compatible with a MicroPython board.
 """
 
-from uasyncio import sleep
+from uasyncio import sleep, StreamReader, StreamWriter
 from binascii import hexlify, unhexlify
 from pyb import USB_VCP
 from .backend import Backend
@@ -20,11 +20,13 @@ class USB(Backend):
         self._usb = USB_VCP()
         self._usb.init()
         self._usb.setinterrupt(-1)
+        self._reader = StreamReader(self._usb)
+        self._writer = StreamWriter(self._usb, {})
 
     async def connect(self):
         await sleep(1)  # pyboard needs a moment to wait for USB
-        while not self.is_connected():
-            await sleep(0)
+        while not await self.is_connected():
+            await sleep(0.1)
 
     async def is_connected(self) -> bool:
         return self._usb.isconnected()
@@ -33,14 +35,14 @@ class USB(Backend):
         self._usb.close()
 
     async def read_packet(self) -> Packet:
+        # The stream reader sleeps in the scheduler's poll until the port has data.
         string = b''
         while not (string.endswith(b'\n') and len(string) > 40):
-            await sleep(0)
-            while not self._usb.any():
-                await sleep(0)
-            string += self._usb.read(1)
+            string = await self._reader.readline()
         return Packet.from_bytes(unhexlify(string[-41:-1]))
 
     async def write_packet(self, packet: Packet):
-        string = hexlify(packet.to_bytes()) + b'\n'
-        self._usb.write(string)
+        # The stream writer writes what the port takes right away and buffers the rest; packets written
+        # while it drains go out together, and callers wait here instead of blocking the scheduler.
+        self._writer.write(hexlify(packet.to_bytes()) + b'\n')
+        await self._writer.drain()
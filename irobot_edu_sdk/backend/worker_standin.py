@@ -0,0 +1,111 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Pure-Python stand-in for the web worker's worker_comm module, so that the web Bluetooth backend can
+be run, tested and benchmarked under CPython, with simulated (or any other) robots behind it:
+
+    from irobot_edu_sdk.backend import worker_standin
+    worker = worker_standin.install()  # Before bluetooth_web is imported.
+    from irobot_edu_sdk.backend.bluetooth_web import Bluetooth
+    await worker.add_device('robot-1')
+    robot = Root(Bluetooth())
+
+Like the browser side, every write call takes call_time to reach the worker, and the worker reports
+that it can write again packet_time per packet later.
+"""
+
+import asyncio
+import sys
+import types
+from typing import Dict, List, Optional
+
+from .backend import Backend
+from .simulator import Simulator
+from ..packet import Packet
+
+UART_SERVICE = '6e400001-b5a3-f393-e0a9-e50e24dcca9e'
+RX_CHARACTERISTIC = '6e400003-b5a3-f393-e0a9-e50e24dcca9e'  # Robot to program, as in bluetooth_desktop.
+
+
+class Worker:
+    def __init__(self, call_time: float = 0.002, packet_time: float = 0.0005, batching: bool = True,
+                 device_ids: bool = True):
+        """batching: offer ble_write_packets(). device_ids: report can_write per device, not to every backend."""
+        self.call_time = call_time
+        self.packet_time = packet_time
+        self.batching = batching
+        self.device_ids = device_ids
+        self.devices: Dict[str, Backend] = {}
+        self.calls = 0    # Write calls from Python.
+        self.packets = 0  # Packets written.
+        self.stopped = False
+
+    def module(self) -> types.ModuleType:
+        module = types.ModuleType('worker_comm')
+        module.ble_write_packet = self.ble_write_packet
+        module.ble_disconnect = self.ble_disconnect
+        module.stop_program = self.stop_program
+        module.debug_println = self.debug_println
+        if self.batching:
+            module.ble_write_packets = self.ble_write_packets
+        return module
+
+    async def add_device(self, device_id: str, backend: Optional[Backend] = None):
+        """Connect backend (by default a Simulator) and announce it to the web backend as device_id."""
+        backend = backend or Simulator(device_id)
+        await backend.connect()
+        self.devices[device_id] = backend
+        asyncio.ensure_future(self._forward(device_id, backend))
+        self._web().bluetooth_add_device(device_id)
+
+    @staticmethod
+    def _web():
+        from .bluetooth_web import Bluetooth
+        return Bluetooth
+
+    async def _forward(self, device_id: str, backend: Backend):
+        while True:
+            packet = await backend.read_packet()
+            if packet is None:
+                return
+            self._web().bluetooth_data_reception(device_id, UART_SERVICE, RX_CHARACTERISTIC, packet.to_bytearray())
+
+    async def _write(self, device_id: str, packets: List[bytearray], report_device: bool = True):
+        self.calls += 1
+        self.packets += len(packets)
+        await asyncio.sleep(self.call_time)
+        backend = self.devices[device_id]
+        for data in packets:
+            await backend.write_packet(Packet.from_bytes(bytes(data)))
+        asyncio.get_event_loop().call_later(self.packet_time * len(packets), self._web().bluetooth_can_write,
+                                            device_id if report_device and self.device_ids else None)
+
+    # The worker_comm interface.
+
+    async def ble_write_packet(self, data: bytearray):
+        # The single-robot interface does not say which device: the first one, as in the web app,
+        # and then every backend is told it can write.
+        await self._write(next(iter(self.devices)), [data], report_device=False)
+
+    async def ble_write_packets(self, device_id: str, packets: List[bytearray]):
+        await self._write(device_id, packets)
+
+    def ble_disconnect(self, device_id: str):
+        backend = self.devices.pop(device_id, None)
+        if backend is not None:
+            asyncio.ensure_future(backend.disconnect())
+
+    def stop_program(self):
+        self.stopped = True
+
+    def debug_println(self, *args):
+        print(*args)
+
+
+def install(**kwargs) -> Worker:
+    """Make a Worker the worker_comm module. Takes the arguments of Worker."""
+    worker = Worker(**kwargs)
+    sys.modules['worker_comm'] = worker.module()
+    return worker
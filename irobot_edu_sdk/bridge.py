@@ -0,0 +1,198 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Serves robots on other backends to programs on the network, which connect to them with the Socket backend.
+
+Each robot gets a channel, in the order given; a client subscribes to a channel by sending on it, and
+receives that robot's packets from then on. The bridge listens for TCP and UDP on the same port.
+
+    python -m irobot_edu_sdk.bridge --simulate 4
+    python -m irobot_edu_sdk.bridge --serial /dev/ttyACM0 --bluetooth ROOT --host 0.0.0.0
+
+    robot = Root(Socket('localhost', channel=0))
+"""
+
+import argparse
+import asyncio
+from typing import Dict, List, Set
+
+from .backend.backend import Backend
+from .backend.socket import DEFAULT_PORT, FrameSplitter, frame
+from .packet import Packet
+
+
+class _TcpClient(asyncio.Protocol):
+    def __init__(self, bridge: 'Bridge'):
+        self._bridge = bridge
+        self._splitter = FrameSplitter()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        for channel, packet in self._splitter.feed(data):
+            self._bridge._received(self, channel, packet)
+
+    def connection_lost(self, exc):
+        self._bridge._unsubscribe(self)
+
+    def send(self, data: bytes):
+        self.transport.write(data)
+
+
+class _UdpClient:
+    def __init__(self, transport, addr):
+        self.transport = transport
+        self.addr = addr
+
+    def send(self, data: bytes):
+        self.transport.sendto(data, self.addr)
+
+
+class _UdpServer(asyncio.DatagramProtocol):
+    def __init__(self, bridge: 'Bridge'):
+        self._bridge = bridge
+        self._clients = {}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        client = self._clients.get(addr)
+        if client is None:
+            client = self._clients[addr] = _UdpClient(self.transport, addr)
+        for channel, packet in FrameSplitter().feed(data):
+            self._bridge._received(client, channel, packet)
+
+
+class Bridge:
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, backends: List[Backend], host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        if len(backends) > 256:
+            raise ValueError('A bridge serves at most 256 robots')
+        self.backends = backends
+        self.host = host
+        self.port = port
+        self._subscribers: Dict[int, Set] = {channel: set() for channel in range(len(backends))}
+        self._outgoing: Dict[int, asyncio.Queue] = {}
+        self._tasks = []
+        self._servers = []
+        self.packets_in = 0   # From clients to robots.
+        self.packets_out = 0  # From robots to clients, counted once per client.
+
+    async def start(self):
+        """Connect the robots and start listening."""
+        await asyncio.gather(*(backend.connect() for backend in self.backends))
+        loop = asyncio.get_event_loop()
+        for channel, backend in enumerate(self.backends):
+            self._outgoing[channel] = asyncio.Queue()
+            self._tasks.append(asyncio.ensure_future(self._write_packets(channel, backend)))
+            self._tasks.append(asyncio.ensure_future(self._read_packets(channel, backend)))
+        self._servers.append(await loop.create_server(lambda: _TcpClient(self), self.host, self.port))
+        transport, _ = await loop.create_datagram_endpoint(lambda: _UdpServer(self), local_addr=(self.host, self.port))
+        self._servers.append(transport)
+
+    async def stop(self):
+        for server in self._servers:
+            server.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*(backend.disconnect() for backend in self.backends), return_exceptions=True)
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    def _received(self, client, channel: int, packet: Packet):
+        if channel not in self._outgoing:
+            return  # No robot on this channel.
+        if not packet.check_crc():
+            return  # Corrupted: the robot would drop it, but the backend would send it with a fresh CRC.
+        self._subscribers[channel].add(client)
+        self.packets_in += 1
+        self._outgoing[channel].put_nowait(packet)
+
+    def _unsubscribe(self, client):
+        for subscribers in self._subscribers.values():
+            subscribers.discard(client)
+
+    async def _write_packets(self, channel: int, backend: Backend):
+        # One writer per robot keeps its packets in order without holding up the others.
+        queue = self._outgoing[channel]
+        while True:
+            packet = await queue.get()
+            try:
+                await backend.write_packet(packet)
+            except Exception as e:
+                print(f'Bridge: channel {channel}: could not write: {e}')
+
+    async def _read_packets(self, channel: int, backend: Backend):
+        while True:
+            packet = await backend.read_packet()
+            if packet is None:
+                if not await backend.is_connected():
+                    await self._reconnect(channel, backend)
+                continue
+            data = frame(channel, packet)
+            for client in self._subscribers[channel]:
+                client.send(data)
+                self.packets_out += 1
+
+    async def _reconnect(self, channel: int, backend: Backend):
+        print(f'Bridge: channel {channel}: robot disconnected; reconnecting')
+        while True:
+            try:
+                await backend.connect()
+                return
+            except Exception:
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve robots to Socket backends over TCP and UDP',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--simulate', type=int, default=0, metavar='N', help='Number of simulated robots to serve')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response latency of simulated robots, in seconds')
+    parser.add_argument('--serial', action='append', default=[], metavar='PATH', help='Serve the robot on this serial port')
+    parser.add_argument('--bluetooth', action='append', default=[], metavar='NAME',
+                        help="Serve the Bluetooth robot with this name ('' for any)")
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='TCP and UDP port to listen on')
+    args = parser.parse_args()
+
+    backends = []
+    labels = []
+    for path in args.serial:
+        from .backend.serial import Serial
+        backends.append(Serial(path))
+        labels.append(f'serial {path}')
+    for name in args.bluetooth:
+        from .backend.bluetooth import Bluetooth
+        backends.append(Bluetooth(name or None))
+        labels.append(f'Bluetooth {name or "(any)"}')
+    for i in range(args.simulate):
+        from .backend.simulator import Simulator
+        backends.append(Simulator(f'Simulator{i}', latency=args.latency))
+        labels.append(f'simulator {i}')
+    if not backends:
+        parser.error('Nothing to serve: use --simulate, --serial or --bluetooth')
+
+    for channel, label in enumerate(labels):
+        print(f'Channel {channel}: {label}')
+    print(f'Listening on {args.host}:{args.port} (TCP and UDP)')
+    try:
+        asyncio.run(Bridge(backends, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
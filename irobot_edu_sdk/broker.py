@@ -0,0 +1,276 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Local broker that keeps connections to robots open between program runs and shares them between programs.
+
+    python -m irobot_edu_sdk.broker --connect ROOT
+    robot = Root(Brokered('ROOT'))  # In any number of programs, started any number of times.
+
+Programs attach through a Unix socket (see backend.brokered). The broker connects to a robot with the usual
+backends the first time a program asks for it, and keeps the connection afterwards. Each program numbers its
+requests independently, so the broker gives every request forwarded to the robot its own inc and sends the
+response back to the program that asked, with that program's inc. Events go to every program that has them
+enabled; the robot has the events of all its programs enabled.
+
+Robot programs start by sending stop and reset, which would stop a program already driving the robot and
+reset its events. A program's first stop and reset is therefore only passed on when no other program is
+attached; later ones (an explicit stop()) always are. Either way the robot's events are then set to those
+of all its programs again. A program's disconnect only detaches that program: the broker keeps the robot
+connected (until idle_timeout, if set). Packets failing their CRC check are dropped in both directions, as
+the robot and the SDK would, since relaying them re-signs them with a valid CRC.
+
+POSIX only.
+"""
+
+import argparse
+import asyncio
+import os
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from .backend.backend import Backend
+from .backend.brokered import default_socket_path
+from .packet import Packet
+
+ALL_EVENTS = (1 << 128) - 1
+
+
+def open_backend(name: str) -> Backend:
+    """Serial for names starting with /dev/ or COM, else Bluetooth."""
+    if name.startswith('/dev/') or name.upper().startswith('COM'):
+        from .backend.serial import Serial
+        return Serial(name)
+    from .backend.bluetooth import Bluetooth
+    return Bluetooth(name or None)
+
+
+class _Client:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.events = ALL_EVENTS  # Devices this program has events enabled for, as the robot does after a reset.
+        self.started = False  # Whether its first stop and reset has been seen.
+
+    def send(self, packet: Packet):
+        if self.writer.transport.get_write_buffer_size() > Broker.MAX_CLIENT_BUFFER:
+            self.writer.close()  # Not reading: drop it rather than buffering without limit.
+        elif not self.writer.is_closing():
+            self.writer.write(packet.to_bytes())
+
+
+class _Robot:
+    def __init__(self, name: str, backend: Backend):
+        self.name = name
+        self.backend = backend
+        self.clients: Set[_Client] = set()
+        self.requests: Dict[Tuple[int, int, int], Tuple[_Client, int]] = {}  # (dev, cmd, robot inc): client, its inc
+        self.inc = 0
+        self.idle_timer = None
+        self.reader = None
+
+    def events(self) -> int:
+        union = 0
+        for client in self.clients:
+            union |= client.events
+        return union
+
+    async def forward(self, client: _Client, packet: Packet):
+        dev, cmd = packet.dev, packet.cmd
+        payload = packet.payload
+        if (dev, cmd) == (0, 3):  # Stop and reset: the robot enables all events again.
+            client.events = ALL_EVENTS
+            starting, client.started = not client.started, True
+            if not (starting and len(self.clients) > 1):
+                await self.backend.write_packet(Packet(dev, cmd, self._next_inc(), payload))
+            await self.sync_events()
+            return
+        if (dev, cmd) == (0, 7):  # Enable events: the robot needs the events of every program.
+            client.events |= int.from_bytes(payload, 'big')
+            payload = self.events().to_bytes(16, 'big')
+        elif (dev, cmd) == (0, 9):  # Disable events: only those no other program uses.
+            client.events &= ~int.from_bytes(payload, 'big')
+            payload = (int.from_bytes(payload, 'big') & ~self.events()).to_bytes(16, 'big')
+        inc = self._next_inc()
+        self.requests[(dev, cmd, inc)] = (client, packet.inc)
+        await self.backend.write_packet(Packet(dev, cmd, inc, payload))
+
+    async def sync_events(self):
+        """Enable the events of all programs on the robot and disable the rest."""
+        events = self.events()
+        await self.backend.write_packet(Packet(0, 7, self._next_inc(), events.to_bytes(16, 'big')))
+        await self.backend.write_packet(Packet(0, 9, self._next_inc(), (~events & ALL_EVENTS).to_bytes(16, 'big')))
+
+    def _next_inc(self) -> int:
+        inc = self.inc
+        self.inc = (self.inc + 1) % 256
+        return inc
+
+    def dispatch(self, packet: Packet):
+        if not packet.check_crc():
+            return
+        asked = self.requests.pop((packet.dev, packet.cmd, packet.inc), None)
+        if asked is not None:
+            client, inc = asked
+            if client in self.clients:
+                client.send(Packet(packet.dev, packet.cmd, inc, packet.payload))
+            return
+        bit = 1 << packet.dev if packet.dev < 128 else ALL_EVENTS
+        for client in self.clients:
+            if client.events & bit:
+                client.send(packet)
+
+
+class Broker:
+    MAX_CLIENT_BUFFER = 64 * 1024
+
+    def __init__(self, path: Optional[str] = None, open_backend: Callable[[str], Backend] = open_backend,
+                 idle_timeout: Optional[float] = None):
+        """idle_timeout: seconds to keep a robot connected without programs; None keeps it until the broker stops."""
+        self.path = path or default_socket_path()
+        self.open_backend = open_backend
+        self.idle_timeout = idle_timeout
+        self.robots: Dict[str, _Robot] = {}
+        self._connecting: Dict[str, asyncio.Future] = {}
+        self._server = None
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if os.path.exists(self.path):
+            os.remove(self.path)  # Left by a broker that did not stop cleanly.
+        self._server = await asyncio.start_unix_server(self._serve, self.path)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        for robot in list(self.robots.values()):
+            await self._drop(robot)
+
+    async def serve_forever(self, connect=()):
+        await self.start()
+        try:
+            for name in connect:
+                await self.robot(name)
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def robot(self, name: str) -> _Robot:
+        """The robot called name, connecting to it if needed. Programs asking meanwhile wait for the same connection."""
+        if name in self.robots:
+            return self.robots[name]
+        if name not in self._connecting:
+            self._connecting[name] = asyncio.ensure_future(self._connect(name))
+        try:
+            return await asyncio.shield(self._connecting[name])
+        finally:
+            self._connecting.pop(name, None)
+
+    async def _connect(self, name: str) -> _Robot:
+        backend = self.open_backend(name)
+        await backend.connect()
+        robot = self.robots[name] = _Robot(name, backend)
+        robot.reader = asyncio.ensure_future(self._read_packets(robot))
+        print(f'Broker: connected to {name or "a robot"}')
+        return robot
+
+    async def _read_packets(self, robot: _Robot):
+        while True:
+            packet = await robot.backend.read_packet()
+            if packet is None:
+                if not await robot.backend.is_connected():
+                    break
+                continue
+            robot.dispatch(packet)
+        print(f'Broker: lost {robot.name or "the robot"}')
+        robot.reader = None
+        await self._drop(robot)
+
+    async def _drop(self, robot: _Robot):
+        """Forget robot and close its programs' connections; they reconnect through the broker if they want."""
+        if self.robots.get(robot.name) is robot:
+            del self.robots[robot.name]
+        for client in robot.clients:
+            client.writer.close()
+        robot.clients.clear()
+        if robot.idle_timer is not None:
+            robot.idle_timer.cancel()
+        if robot.reader is not None:
+            robot.reader.cancel()
+        try:
+            await robot.backend.disconnect()
+        except Exception:
+            pass
+
+    def _idle(self, robot: _Robot):
+        if not robot.clients:
+            print(f'Broker: disconnecting idle {robot.name or "robot"}')
+            asyncio.ensure_future(self._drop(robot))
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client = _Client(writer)
+        try:
+            name = (await reader.readline()).decode('utf-8').strip()
+            try:
+                robot = await self.robot(name)
+            except Exception as e:
+                writer.write(f'ERR {e or type(e).__name__}\n'.encode('utf-8'))
+                return
+            if robot.idle_timer is not None:
+                robot.idle_timer.cancel()
+                robot.idle_timer = None
+            robot.clients.add(client)
+            await robot.sync_events()  # A new program expects every event, as after a reset.
+            writer.write(b'OK\n')
+            try:
+                while True:
+                    packet = Packet.from_bytes(await reader.readexactly(Packet.PACKET_LEN))
+                    if not packet.check_crc():
+                        continue
+                    if (packet.dev, packet.cmd) == (0, 6):  # Disconnect: only this program lets go of the robot.
+                        self._detach(robot, client)
+                        await robot.sync_events()
+                        continue
+                    await robot.forward(client, packet)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass  # The program ended.
+            self._detach(robot, client)
+        finally:
+            writer.close()
+
+    def _detach(self, robot: _Robot, client: _Client):
+        """Stop relaying robot's packets to client, and start the idle timeout if it was the last program."""
+        if client not in robot.clients:
+            return
+        robot.clients.discard(client)
+        if not robot.clients and self.idle_timeout is not None and self.robots.get(robot.name) is robot:
+            robot.idle_timer = asyncio.get_event_loop().call_later(self.idle_timeout, self._idle, robot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keep robot connections open and share them between programs',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--path', default=default_socket_path(), help='Unix socket to listen on')
+    parser.add_argument('--connect', action='append', default=[], metavar='NAME',
+                        help="Connect to this robot (a Bluetooth name, '' for any, or a serial port) right away")
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Disconnect robots no program has used for this many seconds')
+    parser.add_argument('--simulate', action='store_true', help='Serve simulated robots instead of real ones')
+    args = parser.parse_args()
+
+    factory = open_backend
+    if args.simulate:
+        from .backend.simulator import Simulator
+        factory = lambda name: Simulator(name or 'Simulator')
+
+    print(f'Listening on {args.path}')
+    try:
+        asyncio.run(Broker(args.path, factory, args.idle_timeout).serve_forever(args.connect))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
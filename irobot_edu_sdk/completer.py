@@ -3,12 +3,10 @@
 #
 
 try:
-    from asyncio import sleep
-    from time import time
+    import asyncio
     from typing import Any, Optional
 except ImportError:
-    from uasyncio import sleep
-    from utime import time
+    import uasyncio as asyncio
 
 
 class Completer():
@@ -18,13 +16,15 @@ class Completer():
     def clear(self):
         self._flag = False
         self._data = None
+        self._event = asyncio.Event()
 
     async def wait(self, timeout: Optional[int] = None) -> Optional[Any]:
-        start = int(time())
-        while not self._flag:
-            if timeout and int(time()) - start > timeout:
-                break
-            await sleep(0)
+        """Sleep until complete() is called or timeout seconds pass (no timeout if None or 0)."""
+        if not self._flag:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout or None)
+            except asyncio.TimeoutError:
+                pass
         return self.value()
 
     def is_complete(self) -> bool:
@@ -33,6 +33,7 @@ class Completer():
     def complete(self, data=None):
         self._flag = True
         self._data = data
+        self._event.set()
 
     def value(self) -> Optional[Any]:
         return self._data
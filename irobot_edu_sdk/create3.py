@@ -4,7 +4,7 @@
 
 import math
 from enum import IntEnum, IntFlag
-from typing import Union, Callable, Awaitable, List
+from typing import Union, Callable, Awaitable, List, Optional
 from struct import pack, unpack
 from .backend.backend import Backend
 from .event import Event
@@ -18,6 +18,8 @@ from .robot import Robot
 class Create3(Robot):
     """Create 3 robot object."""
 
+    WHEEL_BASE = 23.5  # cm
+
     class DockStatus(IntEnum):
         SUCCEEDED = 0
         ABORTED   = 1
@@ -38,6 +40,7 @@ class Create3(Robot):
         # Getters.
         self.ipv4_address = IPv4Addresses()
         self.docking_sensor = DockingSensor()
+        self.ir_proximity = IrProximity()
 
         # Use Create 3 robot's internal position estimate
         self.USE_ROBOT_POSE = True
@@ -56,6 +59,7 @@ class Create3(Robot):
             self.docking_sensor.sensors = (packet.payload[5],
                                            packet.payload[6],
                                            packet.payload[7])
+            self._sensor_updated(self.docking_sensor)
 
             for event in self._when_docking_sensor:
                 # TODO: Generate triggers instead of just firing for any event
@@ -66,6 +70,7 @@ class Create3(Robot):
 
     def when_docking_sensor(self, callback: Callable[[bool], Awaitable[None]]):
         self._when_docking_sensor.append(Event(True, callback))
+        self._subscribe_events(19)
 
     # Commands.
 
@@ -74,7 +79,7 @@ class Create3(Robot):
         dev, cmd, inc = 100, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             self.ipv4_address.wlan0 = [packet.payload[0], packet.payload[1], packet.payload[2], packet.payload[3]]
@@ -88,7 +93,7 @@ class Create3(Robot):
         dev, cmd, inc = 11, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             unpacked = unpack('>IHHHHHH', packet.payload)
@@ -107,7 +112,7 @@ class Create3(Robot):
         dev, cmd, inc = 11, 2, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             payload = packet.payload
@@ -126,19 +131,25 @@ class Create3(Robot):
             return ir_proximity
         return None
 
-    async def get_ir_proximity(self):
-        """Version-Agnostic Get IR Proximity Values and States"""
-        ir_prox = await self.get_7x_ir_proximity()
-        if ir_prox is not None:
-            return ir_prox
+    async def get_ir_proximity(self, max_age: Optional[float] = None):
+        """Version-Agnostic Get IR Proximity Values and States.
+        If max_age is given (in seconds), values received that recently are returned without asking the robot."""
+        if max_age is not None and self.ir_proximity.is_fresh(max_age):
+            return self.ir_proximity
+        return await self._round_trip(self.ir_proximity, max_age, self._request_ir_proximity)
 
-        ir_prox = await self.get_6x_ir_proximity()
-        if ir_prox is not None:
+    async def _request_ir_proximity(self):
+        ir_prox = await self.get_7x_ir_proximity()
+        if ir_prox is None:
+            ir_prox = await self.get_6x_ir_proximity()
+            if ir_prox is None:
+                return None
             print('Warning: ir_prox() missing seventh value; you may need to update your robot')
             ir_prox.sensors.append(float('nan'))
-            return ir_prox
 
-        return None
+        self.ir_proximity.sensors = ir_prox.sensors
+        self._sensor_updated(self.ir_proximity)
+        return self.ir_proximity
 
     async def navigate_to(self, x: Union[int, float], y: Union[int, float], heading: Union[int, float] = None):
         """ If heading is None, then it will be ignored, and the robot will arrive to its destination
@@ -158,7 +169,7 @@ class Create3(Robot):
         payload = pack('>iih', int(x * 10), int(y * 10), _heading)
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, payload))
+        await self._write_packet(Packet(dev, cmd, inc, payload))
         
         dx = x - self.pose.x
         dy = y - self.pose.y
@@ -180,7 +191,7 @@ class Create3(Robot):
         dev, cmd, inc = 1, 19, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(60)
         if packet:
             unpacked = unpack('>IBBHHHHH', packet.payload)
@@ -192,7 +203,7 @@ class Create3(Robot):
         dev, cmd, inc = 1, 20, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(30)
         if packet:
             unpacked = unpack('>IBBHHHHH', packet.payload)
@@ -205,7 +216,7 @@ class Create3(Robot):
         dev, cmd, inc = 19, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             unpacked = unpack('>IBBBBHHHH', packet.payload)
@@ -234,12 +245,15 @@ class Create3(Robot):
         return super().get_touch_sensors_cached()[0:2]
 
     def get_cliff_sensors_cached(self):
-        '''Returns tuple of most recently seen cliff sensor state'''
+        '''Returns tuple of most recently seen cliff sensor state.
+           Current however old it is, like get_bumpers_cached(); self.cliff_sensor.received is when it arrived.
+        '''
+        self._stream_events(20)
         return (self.cliff_sensor.left, self.cliff_sensor.front_left,
                 self.cliff_sensor.front_right, self.cliff_sensor.right)
 
     async def get_cliff_sensors(self):
         '''Returns tuple of most recently seen cliff sensor state.
-           If there were a protocol getter, this would await that response when the cache is empty.
+           Same as get_cliff_sensors_cached(), like get_bumpers().
         '''
         return self.get_cliff_sensors_cached()
@@ -33,11 +33,22 @@ class Event:
             self.is_running = False
 
 
-def event(method, condition=None):
+def event(method, condition=None, executor=None):
     """ Convienience decorator that allows to define any function as a device event with the syntax:
         `@event(device.method, condition)`
+        With executor='thread' or 'process', the decorated function is a plain (non-async) function
+        that runs in a worker pool instead of the event loop; see offload.py.
     """
     def decorator_event(func):
+        if executor is not None:
+            from .offload import Offloaded
+            callback = Offloaded(func, executor)
+            if condition != None:
+                method(condition, callback)
+            else:
+                method(callback)
+            return func  # Keep the module-level name picklable for process pools.
+
         if condition != None:
             method(condition, func)
         else:
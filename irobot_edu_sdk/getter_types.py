@@ -3,8 +3,12 @@
 #
 
 import math
-from typing import List
+from typing import List, Optional
 from struct import unpack
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
 
 from .packet import Packet
 
@@ -12,11 +16,29 @@ from .packet import Packet
 # its event callbacks. These classes are Root specific.
 
 
-class Pose:
+class Timestamped:
+    """Base for getters refreshed from robot packets.
+    `received` is the host's monotonic time (in seconds) of the last update, or None."""
+    def __init__(self):
+        self.received: Optional[float] = None
+
+    def stamp(self):
+        self.received = monotonic()
+
+    def age(self) -> Optional[float]:
+        return None if self.received is None else monotonic() - self.received
+
+    def is_fresh(self, max_age: float) -> bool:
+        return self.received is not None and monotonic() - self.received <= max_age
+
+
+class Pose(Timestamped):
     def __init__(self, x=0, y=0, heading=90):
+        super().__init__()
         self.x = x
         self.y = y
         self.heading = heading  # [deg]
+        self.timestamp: Optional[int] = None  # Robot time of the last reported pose [ms]
 
     def move(self, distance):
         self.x += distance * math.cos(math.radians(self.heading))
@@ -43,10 +65,11 @@ class Pose:
     def set_from_packet(self, packet):
         if packet:
             payload = packet.payload
-            #timestamp = unpack('>I', payload[0:4])[0]
+            self.timestamp = unpack('>I', payload[0:4])[0]
             self.x = unpack('>i', payload[4:8])[0] / 10
             self.y = unpack('>i', payload[8:12])[0] / 10
             self.heading = unpack('>h', payload[12:14])[0] / 10
+            self.stamp()
             return self
         return None
 
@@ -69,14 +92,24 @@ class Movement:
         return result
 
 
-class IrProximity:
+class IrProximity(Timestamped):
     def __init__(self):
+        super().__init__()
         self.sensors: List[int] = []
 
 
-class ColorSensor:
+class Accelerometer(Timestamped):
+    def __init__(self):
+        super().__init__()
+        self.x: int = 0
+        self.y: int = 0
+        self.z: int = 0
+
+
+class ColorSensor(Timestamped):
     SENSORS_COUNT = 32
     def __init__(self, colors=[]):
+        super().__init__()
         # contains the 32 areas from the real sensor
         self.colors: List[int] = self.expand_to_width(colors)
 
@@ -127,22 +160,25 @@ class ColorSensor:
         return False
 
 
-class Bumpers:
+class Bumpers(Timestamped):
     def __init__(self):
+        super().__init__()
         self.left = False
         self.right = False
 
 
-class TouchSensors:
+class TouchSensors(Timestamped):
     def __init__(self):
+        super().__init__()
         self.front_left = False
         self.front_right = False
         self.back_right = False
         self.back_left = False
 
 
-class CliffSensor:
+class CliffSensor(Timestamped):
     def __init__(self):
+        super().__init__()
         self.disable_motors = False
         self.left = False
         self.front_left = False
@@ -150,14 +186,16 @@ class CliffSensor:
         self.front_right = False
 
 
-class DockingSensor:
+class DockingSensor(Timestamped):
     def __init__(self):
+        super().__init__()
         self.contacts = None
         self.sensors = (None, None, None)
 
 
-class LightSensors:
+class LightSensors(Timestamped):
     def __init__(self):
+        super().__init__()
         self.state: int = 0
         self.left: int = 0
         self.right: int = 0
@@ -170,13 +208,15 @@ class IPv4Addresses:
         self.usb0: List[int] = []
 
 
-class MotorStall:
+class MotorStall(Timestamped):
     def __init__(self):
+        super().__init__()
         self.motor: int = 0
         self.cause: int = 0
 
 
-class Battery:
+class Battery(Timestamped):
     def __init__(self):
+        super().__init__()
         self.millivolts: int = 0
         self.percent: int = 0
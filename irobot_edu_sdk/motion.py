@@ -0,0 +1,192 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Pipelined motion command queue.
+
+Robot.move(), turn(), arc() and navigate_to() wait for each completion response before the
+next command is even encoded, so the robot sits still for a full round trip between segments.
+The motion queue keeps up to `lookahead` commands queued on the robot behind the one it is
+executing, tracks each completion by (dev, cmd, inc) and updates the pose from every response.
+
+Usage:
+    for x, y in points:
+        robot.motion.enqueue('navigate_to', x, y)
+    robot.motion.enqueue('marker', Root.MarkerPos.UP)
+    await robot.motion.join()
+"""
+
+try:
+    import asyncio
+    from typing import Optional
+except ImportError:
+    import uasyncio as asyncio
+from collections import deque
+from math import atan2, degrees, radians, sqrt
+from struct import pack
+
+from .completer import Completer
+from .getter_types import Pose, Movement
+from .packet import Packet
+from .utils import bound
+
+
+class _Item:
+    def __init__(self, dev: int, cmd: int, payload: bytes, timeout: float, apply):
+        self.dev = dev
+        self.cmd = cmd
+        self.payload = payload
+        self.timeout = timeout
+        self.apply = apply  # Updates a Pose with the command's expected effect.
+        self.future = None  # Shared by the items a command is split into.
+        self.last = True
+
+
+class MotionQueue:
+    COMMANDS = ('move', 'turn_left', 'turn_right', 'arc_left', 'arc_right', 'navigate_to', 'marker')
+
+    def __init__(self, robot, lookahead: int = 1):
+        self._robot = robot
+        self.lookahead = lookahead  # Commands kept queued on the robot behind the executing one.
+        self._pending = deque()
+        self._in_flight = deque()
+        self._planned: Optional[Pose] = None  # Pose expected after every queued command.
+
+    def __len__(self):
+        return len(self._pending) + len(self._in_flight)
+
+    def enqueue(self, command: str, *args) -> asyncio.Future:
+        """Queue one of COMMANDS with the arguments of the Robot method of the same name
+        ('marker' takes a Root.MarkerPos). Returns a future resolving to the pose once it completes, or
+        raising the write error, or asyncio.TimeoutError if the robot did not report completion in time."""
+        if command not in self.COMMANDS:
+            raise ValueError(f'Unknown motion command {command!r}, expected one of {self.COMMANDS}')
+        if self._planned is None:
+            self._planned = Pose(self._robot.pose.x, self._robot.pose.y, self._robot.pose.heading)
+        future = self._robot._loop.create_future()
+
+        items = getattr(self, '_' + command)(*args)
+        for item in items:
+            item.future = future
+            item.last = item is items[-1]
+            self._pending.append(item)
+        self._pump()
+        return future
+
+    async def join(self):
+        """Wait until every queued command has completed."""
+        while len(self):
+            futures = {item.future for item in list(self._in_flight) + list(self._pending)}
+            await asyncio.gather(*futures, return_exceptions=True)
+
+    def clear(self):
+        """Drop queued commands and cancel their futures, e.g. because the robot was stopped."""
+        for item in list(self._pending) + list(self._in_flight):
+            if item.future and not item.future.done():
+                item.future.cancel()
+        self._pending.clear()
+        self._in_flight.clear()
+        self._planned = None
+
+    # Encoders, mirroring the Robot methods of the same name.
+
+    def _item(self, cmd, payload, timeout, apply, dev=1):
+        apply(self._planned)
+        return _Item(dev, cmd, payload, timeout, apply)
+
+    def _move(self, distance):
+        return [self._item(8, pack('>i', int(distance * 10)), self._robot.DEFAULT_TIMEOUT + int(abs(distance) / 10),
+                           lambda pose: pose.move(distance))]
+
+    def _turn(self, angle):
+        if not self._robot.USE_ROBOT_POSE:
+            angle *= self._robot._turn_scale_comp
+            angle += abs(angle) * self._robot._turn_bias_comp
+        return [self._item(12, pack('>i', int(angle * 10)), self._robot.DEFAULT_TIMEOUT + int(abs(angle) / 100),
+                           lambda pose: pose.turn_left(-angle))]
+
+    def _turn_left(self, angle):
+        return self._turn(-angle)
+
+    def _turn_right(self, angle):
+        return self._turn(angle)
+
+    def _arc(self, angle, radius):
+        timeout = 15 + abs(radians(angle) * (abs(radius * 10) + 51.5)) / 100
+        return [self._item(27, pack('>ii', int(angle * 10), int(radius * 10)), timeout,
+                           lambda pose: pose.arc(angle, radius))]
+
+    def _arc_left(self, angle, radius):
+        return self._arc(-angle, -radius)
+
+    def _arc_right(self, angle, radius):
+        return self._arc(angle, radius)
+
+    def _navigate_to(self, x, y, heading=None):
+        if not self._robot.USE_ROBOT_POSE:
+            # Same decomposition as Root.navigate_to(), planned from the pose after the queued commands.
+            dx, dy = x - self._planned.x, y - self._planned.y
+            movement = Movement(sqrt(dx * dx + dy * dy), degrees(atan2(dy, dx)) - self._planned.heading)
+            items = self._turn(-Movement.minimize_angle(movement.angle)) + self._move(movement.distance)
+            if heading is not None:
+                items += self._turn(-Movement.minimize_angle(heading - self._planned.heading))
+            return items
+
+        _heading = -1 if heading is None else bound(int(heading * 10), 0, 3599)
+        dx, dy = x - self._planned.x, y - self._planned.y
+        timeout = self._robot.DEFAULT_TIMEOUT + int(sqrt(dx * dx + dy * dy) / 10) + 4
+
+        def apply(pose):
+            pose.set(x, y, heading if heading is not None else degrees(atan2(y - pose.y, x - pose.x)))
+        return [self._item(17, pack('>iih', int(x * 10), int(y * 10), _heading), timeout, apply)]
+
+    def _marker(self, position):
+        return [self._item(0, bytes([bound(position, 0, 2)]), self._robot.DEFAULT_TIMEOUT, lambda pose: None, dev=2)]
+
+    # Execution.
+
+    def _pump(self):
+        while self._pending and len(self._in_flight) <= self.lookahead:
+            item = self._pending.popleft()
+            # Queued behind the commands already in flight, so its timeout starts when they are done.
+            timeout = item.timeout + sum(other.timeout for other in self._in_flight)
+            self._in_flight.append(item)
+            self._robot._loop.create_task(self._execute(item, timeout))
+
+    async def _execute(self, item: _Item, timeout: float):
+        robot = self._robot
+        try:
+            packet = None
+            if not robot._disable_motors:
+                inc = robot.inc
+                completer = Completer()
+                robot._responses[(item.dev, item.cmd, inc)] = completer
+                await robot._write_packet(Packet(item.dev, item.cmd, inc, item.payload))
+                packet = await completer.wait(timeout)
+                if packet is None:
+                    raise asyncio.TimeoutError(f'motion command {item.dev},{item.cmd} did not complete in {timeout} s')
+
+            if item not in self._in_flight:
+                return  # Cleared while executing.
+            if robot.USE_ROBOT_POSE and packet and item.dev == 1:
+                robot.pose.set_from_packet(packet)
+            else:
+                item.apply(robot.pose)
+            if item.last and not item.future.done():
+                item.future.set_result(robot.pose)
+        except Exception as e:
+            if item in self._in_flight:
+                self._fail(item, e)
+        finally:
+            if item in self._in_flight:
+                self._in_flight.remove(item)
+            if not len(self):
+                self._planned = None
+            self._pump()
+
+    def _fail(self, item: _Item, error: Exception):
+        """Fail item's command and drop the rest of it. The pose is left as last reported, not as planned."""
+        if not item.future.done():
+            item.future.set_exception(error)
+        self._pending = deque(other for other in self._pending if other.future is not item.future)
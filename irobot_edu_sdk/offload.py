@@ -0,0 +1,141 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Runs CPU-heavy, synchronous user code in a thread or process pool so that it
+does not block the asyncio loop that reads packets from every robot.
+
+Usage:
+    @event(robot.when_color_scanned, [Color.RED], executor='thread')
+    def scanned(robot):                     # plain def, runs in a worker thread
+        path = plan_path(robot.color_sensor.colors)
+        return robot.set_lights_rgb(255, 0, 0)  # returned coroutines are awaited on the loop
+
+    result = await robot.offload(plan_path, colors, executor='process')
+"""
+
+import asyncio
+import copy
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from . import getter_types
+
+THREAD = 'thread'
+PROCESS = 'process'
+
+
+class Offloader:
+    """Lazily created thread and process pools shared by all robots."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 32):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._pools: Dict[str, Any] = {}
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+        self._pending = {THREAD: 0, PROCESS: 0}
+        self._running = {THREAD: 0, PROCESS: 0}
+        self._completed = {THREAD: 0, PROCESS: 0}
+
+    def _pool(self, kind: str):
+        if kind not in (THREAD, PROCESS):
+            raise ValueError(f"executor must be '{THREAD}' or '{PROCESS}', not {kind!r}")
+        if kind not in self._pools:
+            if kind == THREAD:
+                self._pools[kind] = ThreadPoolExecutor(self.max_workers, thread_name_prefix='irobot-offload')
+            else:
+                self._pools[kind] = ProcessPoolExecutor(self.max_workers)
+            self._slots[kind] = asyncio.Semaphore(self.max_pending)
+        return self._pools[kind]
+
+    async def run(self, kind: str, func: Callable, *args) -> Any:
+        """Run func(*args) in the selected pool and return its result on the loop.
+        Waits while max_pending calls are already queued or running in that pool."""
+        pool = self._pool(kind)
+        loop = asyncio.get_event_loop()
+        async with self._slots[kind]:
+            self._pending[kind] += 1
+            try:
+                return await loop.run_in_executor(pool, functools.partial(self._track, kind, func), *args)
+            finally:
+                self._pending[kind] -= 1
+                self._completed[kind] += 1
+
+    def _track(self, kind: str, func: Callable, *args):
+        # Runs in the worker; only the thread pool shares these counters with the loop.
+        self._running[kind] += 1
+        try:
+            return func(*args)
+        finally:
+            self._running[kind] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Pool size and queue depth for each pool that has been started."""
+        stats = {}
+        for kind, pool in self._pools.items():
+            workers = getattr(pool, '_max_workers', None)
+            stats[kind] = {
+                'workers': workers,
+                'pending': self._pending[kind],
+                'running': self._running[kind] if kind == THREAD else min(self._pending[kind], workers or 0),
+                'completed': self._completed[kind],
+                'max_pending': self.max_pending,
+            }
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+        self._pools.clear()
+        self._slots.clear()
+
+    # ProcessPoolExecutor pickles the bound _track method, so never ship pools and semaphores along.
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_pools'] = {}
+        state['_slots'] = {}
+        return state
+
+
+# Default pools used by Robot.offload() and the @event(..., executor=...) option.
+offloader = Offloader()
+
+
+def snapshot(robot) -> SimpleNamespace:
+    """Picklable copy of a robot's sensor getters (pose, bumpers, color_sensor, ...),
+    handed to process-pool handlers instead of the robot itself."""
+    state = SimpleNamespace()
+    for name, value in vars(robot).items():
+        if not name.startswith('_') and type(value).__module__ == getter_types.__name__:
+            setattr(state, name, copy.deepcopy(value))
+    return state
+
+
+class Offloaded:
+    """Async event callback that runs a synchronous handler in a pool.
+
+    Thread handlers receive the robot; process handlers receive snapshot(robot).
+    If the handler returns an awaitable (e.g. robot.set_lights_rgb(...) called from a thread),
+    it is awaited on the loop. The last return value is kept in `result`."""
+
+    def __init__(self, func: Callable, kind: str, pool: Offloader = None):
+        if inspect.iscoroutinefunction(func):
+            raise TypeError(f'{func.__name__} must be a plain function to run in a {kind} executor')
+        self.func = func
+        self.kind = kind
+        self.pool = pool if pool is not None else offloader
+        self.pool._pool(kind)  # Fail early on an unknown executor name.
+        self.result = None
+        functools.update_wrapper(self, func)
+
+    async def __call__(self, robot):
+        arg = robot if self.kind == THREAD else snapshot(robot)
+        result = await self.pool.run(self.kind, self.func, arg)
+        if inspect.isawaitable(result):
+            result = await result
+        self.result = result
+        return result
@@ -28,6 +28,7 @@ class Packet():
         assert len(payload) <= self.PAYLOAD_LEN, "invalid payload length"
         self.payload = payload + bytes(self.PAYLOAD_LEN - len(payload))
         self._crc = crc if force_crc is False else self.calc_crc()
+        self._crc_ok = None
 
     @classmethod
     def from_bytes(cls, raw: bytes):
@@ -48,8 +49,10 @@ class Packet():
         return pack("3B", self.dev, self.cmd, self.inc) + self.payload
 
     def check_crc(self):
-        """check if computed crc matches stored crc"""
-        return False if self._crc is None else self._crc == self.calc_crc()
+        """check if computed crc matches stored crc (computed once per packet)"""
+        if self._crc_ok is None:
+            self._crc_ok = False if self._crc is None else self._crc == self.calc_crc()
+        return self._crc_ok
 
     def calc_crc(self) -> int:
         """calculates crc for packet"""
@@ -0,0 +1,135 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Central polling scheduler for periodic getters.
+
+Instead of one `while True` loop of round trips per sensor, programs declare the rates they need:
+    robot.poll('accelerometer', hz=20)
+    robot.poll('ir_proximity', hz=10)
+A single task then interleaves the requests, earliest deadline first, under one in-flight budget.
+Results land in the robot's getter objects, so e.g. get_accelerometer(max_age=0.1) is answered
+without another round trip.
+"""
+
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import Dict, Optional
+
+
+class _Source:
+    def __init__(self, name: str, getter, hz: float, first_due: float):
+        self.name = name
+        self.getter = getter
+        self.hz = hz
+        self.period = 1 / hz
+        self.due = first_due
+        self.completions = deque()
+        self.failures = 0
+
+
+class Poller:
+    # Polled name: getter method. Only the getters a robot has can be polled.
+    SOURCES = {
+        'accelerometer': 'get_accelerometer',
+        'battery': 'get_battery_level',
+        'position': 'get_position',
+        'light': 'get_light_values',
+        'ir_proximity': 'get_ir_proximity',
+    }
+    RATE_WINDOW = 5  # seconds over which achieved rates are measured
+
+    def __init__(self, robot, max_in_flight: int = 1):
+        self._robot = robot
+        self.max_in_flight = max_in_flight
+        self._sources: Dict[str, _Source] = {}
+        self._in_flight = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task = None
+
+    def poll(self, name: str, hz: float):
+        """Request that a getter be sampled hz times per second; hz=0 stops polling it."""
+        if hz <= 0:
+            self._sources.pop(name, None)
+            return
+        method = self.SOURCES.get(name)
+        getter = getattr(self._robot, method, None) if method else None
+        if getter is None:
+            raise ValueError(f"{type(self._robot).__name__} cannot poll {name!r}; pollable: {self.pollable()}")
+
+        now = monotonic()
+        if name in self._sources:
+            source = self._sources[name]
+            source.hz, source.period = hz, 1 / hz
+        else:
+            # Spread the first requests over a period instead of bursting them together.
+            count = len(self._sources)
+            self._sources[name] = _Source(name, getter, hz, now + (1 / hz) * count / (count + 1))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = self._robot._loop.create_task(self._run())
+
+    def pollable(self):
+        return [name for name, method in self.SOURCES.items() if hasattr(self._robot, method)]
+
+    def stop(self):
+        self._sources.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Requested versus achieved rate (over the last RATE_WINDOW seconds) and failures per polled getter."""
+        now = monotonic()
+        stats = {}
+        for source in self._sources.values():
+            self._trim(source, now)
+            stats[source.name] = {
+                'requested_hz': source.hz,
+                'achieved_hz': len(source.completions) / self.RATE_WINDOW,
+                'failures': source.failures,
+            }
+        return stats
+
+    def _trim(self, source: _Source, now: float):
+        while source.completions and now - source.completions[0] > self.RATE_WINDOW:
+            source.completions.popleft()
+
+    async def _run(self):
+        while self._sources:
+            source = min(self._sources.values(), key=lambda s: s.due)
+            delay = source.due - monotonic()
+            blocked = self._in_flight >= self.max_in_flight or not self._robot._run
+            if delay > 0 or blocked:
+                # Sleep until the next deadline, a finished request or a registration change.
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), 0.05 if blocked else delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            now = monotonic()
+            # Don't try to catch up on missed periods all at once.
+            source.due = max(source.due + source.period, now + source.period / 2)
+            self._in_flight += 1
+            self._robot._loop.create_task(self._request(source))
+
+    async def _request(self, source: _Source):
+        try:
+            result = await source.getter()
+        except Exception:
+            result = None
+        finally:
+            self._in_flight -= 1
+            self._wakeup.set()
+        now = monotonic()
+        if result is None:
+            source.failures += 1
+        else:
+            source.completions.append(now)
+            self._trim(source, now)
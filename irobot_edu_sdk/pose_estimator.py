@@ -0,0 +1,147 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Predicts the robot's pose between pose polls, from the last pose reported by the robot and the
+wheel speeds commanded since then, so that get_position(max_age=...) can be answered locally.
+"""
+
+from math import cos, sin, radians, degrees, sqrt
+from struct import unpack
+from typing import List, Optional, Set, Tuple
+try:
+    from time import monotonic
+except ImportError:
+    from time import time as monotonic
+
+from .getter_types import Pose
+from .packet import Packet
+
+
+class PoseEstimate(Pose):
+    """Extrapolated pose, with diagonal covariance (cm², cm², deg²) and a scalar position uncertainty (cm)."""
+    def __init__(self, x, y, heading, covariance: Tuple[float, float, float], received: float):
+        super().__init__(x, y, heading)
+        self.covariance = covariance
+        self.uncertainty = sqrt(covariance[0] + covariance[1])
+        self.received = received
+
+
+class PoseEstimator:
+    # Motor commands with robot-controlled kinematics (drive distance/angle/arc, navigate, dock, undock).
+    # While one is running, or queued on the robot behind another, the pose cannot be extrapolated.
+    MOTION_COMMANDS = (8, 12, 17, 19, 20, 27)
+
+    def __init__(self, robot, max_uncertainty: float = 1.0):
+        self._robot = robot
+        self.max_uncertainty = max_uncertainty  # cm; above this get_position() asks the robot again.
+        self.base_variance = 0.01     # cm², of a fresh report.
+        self.distance_noise = 0.05    # Position standard deviation per cm driven.
+        self.heading_noise = 0.05     # Heading standard deviation per degree turned.
+        self.drift = 0.1              # Position standard deviation per second while the wheels turn, in cm.
+        # Commanded (host time, left, right) wheel speeds in cm/s, oldest first.
+        self._speeds: List[Tuple[float, float, float]] = [(0.0, 0.0, 0.0)]
+        self._motion_started: Optional[float] = None
+        self._outstanding: Set[Tuple[int, int]] = set()  # (cmd, inc) of motions sent and not yet completed.
+        self._clock_offset: Optional[float] = None  # host monotonic time minus robot time, both in seconds.
+        self._anchor_received: Optional[float] = None
+        self._anchor_time: Optional[float] = None
+
+    def observe_command(self, packet: Packet):
+        """Track a motor command being sent to the robot."""
+        if packet.dev != 1:
+            return
+        now = monotonic()
+        left, right = self._speeds[-1][1:]
+        if packet.cmd == 4:
+            left, right = (v / 10 for v in unpack('>ii', packet.payload[0:8]))
+        elif packet.cmd == 6:
+            left = unpack('>i', packet.payload[0:4])[0] / 10
+        elif packet.cmd == 7:
+            right = unpack('>i', packet.payload[0:4])[0] / 10
+        elif packet.cmd in self.MOTION_COMMANDS:
+            self._motion_started = now
+            self._outstanding.add((packet.cmd, packet.inc))
+            left, right = 0.0, 0.0  # The robot stops its wheels once the motion completes.
+        else:
+            return
+        self._speeds.append((now, left, right))
+
+    def observe_response(self, packet: Packet):
+        """Track a response from the robot; the response to a motion command means it has completed."""
+        if packet.dev == 1:
+            self._outstanding.discard((packet.cmd, packet.inc))
+
+    def observe_stop(self):
+        self._speeds.append((monotonic(), 0.0, 0.0))
+        self._motion_started = None
+        self._outstanding.clear()
+
+    def _anchor(self) -> Optional[float]:
+        """Host time at which the last reported pose was measured."""
+        pose = self._robot.pose
+        if pose.received is None:
+            return None
+        if pose.received != self._anchor_received:
+            self._anchor_received = pose.received
+            self._anchor_time = pose.received
+            robot_time = getattr(pose, 'timestamp', None)
+            if robot_time is not None:
+                # The smallest host-minus-robot offset seen has the least transport latency in it.
+                offset = pose.received - robot_time / 1000
+                if self._clock_offset is None or offset < self._clock_offset or offset - self._clock_offset > 60:
+                    self._clock_offset = offset
+                self._anchor_time = min(pose.received, robot_time / 1000 + self._clock_offset)
+            # Forget speed commands that ended before the anchor, keeping the one in effect at that time.
+            while len(self._speeds) > 1 and self._speeds[1][0] <= self._anchor_time:
+                self._speeds.pop(0)
+        return self._anchor_time
+
+    def predict(self, max_age: Optional[float] = None) -> Optional[PoseEstimate]:
+        """Pose extrapolated to now, or None if the robot must be asked: no pose report (within max_age seconds),
+        a robot-controlled motion not completed yet or started since the report, or uncertainty above
+        max_uncertainty. A motion whose completion response never came keeps it asking until a stop."""
+        anchor = self._anchor()
+        now = monotonic()
+        if anchor is None or (max_age is not None and now - self._robot.pose.received > max_age):
+            return None
+        if self._outstanding:
+            return None  # With pipelined motions an earlier completion can arrive after the next one started.
+        if self._motion_started is not None and self._motion_started >= self._robot.pose.received:
+            return None
+
+        pose = self._robot.pose
+        x, y, heading = pose.x, pose.y, pose.heading
+        distance = turned = moving = 0.0
+        wheel_base = getattr(self._robot, 'WHEEL_BASE', None)
+        for i, (start, left, right) in enumerate(self._speeds):
+            start = max(start, anchor)
+            end = self._speeds[i + 1][0] if i + 1 < len(self._speeds) else now
+            dt = end - start
+            if dt <= 0 or (left == 0 and right == 0):
+                continue
+            if left != right and not wheel_base:
+                return None  # Turning, but the robot's wheel base is unknown.
+            v = (left + right) / 2
+            w = degrees((right - left) / wheel_base) if left != right else 0.0
+            if abs(w) < 1e-6:
+                x += v * dt * cos(radians(heading))
+                y += v * dt * sin(radians(heading))
+            else:
+                r = v / radians(w)
+                new_heading = heading + w * dt
+                x += r * (sin(radians(new_heading)) - sin(radians(heading)))
+                y -= r * (cos(radians(new_heading)) - cos(radians(heading)))
+                heading = new_heading
+            distance += abs(v) * dt
+            turned += abs(w) * dt
+            moving += dt
+
+        position_sd = self.distance_noise * distance + self.drift * moving
+        variance = self.base_variance + position_sd * position_sd
+        heading_variance = self.base_variance + (self.heading_noise * turned) ** 2
+        estimate = PoseEstimate(x, y, heading, (variance, variance, heading_variance), pose.received)
+        if estimate.uncertainty > self.max_uncertainty:
+            return None
+        return estimate
@@ -4,9 +4,11 @@
 
 try:
     import asyncio
-    from typing import Union, Dict, Tuple, Callable, Awaitable, List
+    from typing import Union, Dict, Tuple, Callable, Awaitable, List, Optional
+    from time import monotonic
 except ImportError:
     import uasyncio as asyncio
+    from time import time as monotonic
 
 from enum import IntEnum
 from struct import pack, unpack
@@ -17,7 +19,11 @@ from .utils import bound, is_web
 from .color import Color
 from .backend.backend import Backend
 from .event import Event
-from .getter_types import Bumpers, TouchSensors, CliffSensor, MotorStall, Battery, Pose
+from .stream import WheelSpeedStream
+from .motion import MotionQueue
+from .pose_estimator import PoseEstimator
+from .poller import Poller
+from .getter_types import Timestamped, Accelerometer, Bumpers, TouchSensors, CliffSensor, MotorStall, Battery, Pose
 import signal
 import sys
 
@@ -31,9 +37,33 @@ class Robot:
     """Base class for mobile robots."""
     DEFAULT_TIMEOUT = 3
 
+    # Event devices that stay enabled even without handlers: general (stop button) and motors (stall).
+    ALWAYS_ENABLED_EVENTS = (0, 1)
+
+    # Idempotent setters whose last sent payload is shadowed, as (dev, cmd):
+    # left/right motor speed, gravity compensation, marker, lights and stop sound.
+    SHADOWED_SETTERS = ((1, 6), (1, 7), (1, 13), (2, 0), (3, 2), (5, 1))
+    # Motor commands that change the wheel speeds, and so invalidate the left/right speed shadows.
+    _MOTION_COMMANDS = (4, 6, 7, 8, 12, 17, 19, 20, 27)
+
+    # Requests that are sent again if the link drops before their response arrives, as (dev, cmd):
+    # versions, name, enabled events, serial number, SKU, position, color sensor, IR proximity,
+    # light sensors, battery, accelerometer, docking sensors, IPv4 addresses and marker.
+    # Any other pending request (motions, sounds...) fails instead, as if it had timed out.
+    IDEMPOTENT_REQUESTS = ((0, 0), (0, 2), (0, 11), (0, 14), (0, 15), (1, 16), (4, 1), (11, 1), (11, 2),
+                           (13, 1), (14, 1), (16, 1), (19, 1), (100, 1), (2, 0))
+    # Shadowed setters re-applied after a reconnect: lights and gravity compensation.
+    RESTORED_SETTERS = ((3, 2), (1, 13))
+    # Seconds before the first reconnect attempt; the delay doubles after each failure, up to the maximum.
+    RECONNECT_DELAY = 0.5
+    RECONNECT_MAX_DELAY = 30
+
     # Speed.
     MAX_SPEED = 500  # cm/s
 
+    # Distance between the wheels in cm, used to extrapolate the pose while turning. None if unknown.
+    WHEEL_BASE = None
+
     # Direction.
     class Dir(IntEnum):
         LEFT = 0
@@ -77,11 +107,37 @@ class Robot:
             self.on_data_reception(self.data_reception)
 
         self.pose = Pose()
+        # Extrapolates the robot-reported pose for get_position(max_age=...).
+        self.pose_estimator = PoseEstimator(self)
 
         self._inc = 0
         self._disable_motors = False
         self._loop = asyncio.get_event_loop()
         self._responses: Dict[Tuple[int, int, int], Completer] = {}
+        # Getter round trips shared by callers using max_age.
+        self._in_flight: Dict[Timestamped, asyncio.Task] = {}
+
+        # Reference counts of event handlers, getter streams and waiters per event device.
+        # When auto_events is True, only devices in use (plus ALWAYS_ENABLED_EVENTS) are enabled on the robot.
+        self.auto_events = True
+        self._event_refs: Dict[int, int] = {}
+        self._event_streams = set()
+        self._enabled_events: Optional[int] = None
+        self._events_sync = None
+        self._events_lock = asyncio.Lock()  # Syncs must not interleave their enable and disable packets.
+        self.packets_received = 0
+
+        # Last payload sent to each of SHADOWED_SETTERS; identical calls are suppressed without I/O.
+        self._shadow: Dict[Tuple[int, int], bytes] = {}
+        self.suppressed_writes = 0
+
+        # When the link drops, reconnect and resume the session instead of ending the program.
+        self.auto_reconnect = True
+        self._sent_requests: Dict[Tuple[int, int, int], Packet] = {}  # Packets of the pending _responses.
+        self._reconnect_times: List[float] = []
+        self._reconnect_attempts = 0
+        self._requests_resent = 0
+        self._requests_failed = 0
 
         self._events = {
             # (dev, cmd): event_handler(packet)
@@ -106,9 +162,17 @@ class Robot:
         self.battery = Battery()
         self.touch_sensors = TouchSensors()
         self.cliff_sensor = CliffSensor()
+        self.accelerometer = Accelerometer()
 
         self.sound_enabled = True
 
+        # Latest-wins channel used by stream_wheel_speeds().
+        self.wheel_stream = WheelSpeedStream(self)
+        # Pipelined queue of motion commands, see motion.py.
+        self.motion = MotionQueue(self)
+        # Shared scheduler for periodically sampled getters, see poll().
+        self.poller = Poller(self)
+
         # Whether or not the local pose estimate should use the robot's estimate or calculate locally
         self.USE_ROBOT_POSE = False
         # Default to no turn angle compensation
@@ -162,6 +226,8 @@ class Robot:
 
     def _decode_packet(self, packet):
         """"A received packet can either be an event or a response to a command. The callback function for an event is run in a new async coroutine. A command response unblocks the command's async coroutine with received data."""
+        self.packets_received += 1
+
         # Check CRC.
         if not packet.check_crc():
             return
@@ -175,18 +241,184 @@ class Robot:
         # Check if packet is a command response.
         key = (packet.dev, packet.cmd, packet.inc)
         if key in self._responses.keys():
+            self.pose_estimator.observe_response(packet)
             completer = self._responses.pop(key)
+            self._sent_requests.pop(key, None)
             completer.complete(packet)
             return
 
         # Unknown packet type if we got to here.
 
+    async def _write_packet(self, packet: Packet):
+        """Send a packet to the robot, keeping the setter shadow state up to date."""
+        if (packet.dev, packet.cmd, packet.inc) in self._responses:
+            self._sent_requests[(packet.dev, packet.cmd, packet.inc)] = packet
+        if (packet.dev, packet.cmd) == (0, 3):
+            self.pose_estimator.observe_stop()
+        else:
+            self.pose_estimator.observe_command(packet)
+        try:
+            sent = await self._backend.write_packet(packet)
+        except Exception:
+            self.invalidate_shadow()  # The robot may or may not have received it.
+            raise
+        if sent is False:  # Dropped by the backend, e.g. past its deadline in the Bluetooth scheduler.
+            self.invalidate_shadow()
+        else:
+            self._update_shadow(packet)
+
+    def _update_shadow(self, packet: Packet):
+        key = (packet.dev, packet.cmd)
+        if key == (0, 3):  # Stop and reset, which also resets the robot's enabled events.
+            self._shadow.clear()
+            self._enabled_events = None
+            self._event_subscriptions_changed()
+        elif packet.dev == 1 and packet.cmd in self._MOTION_COMMANDS:
+            self._shadow.pop((1, 6), None)
+            self._shadow.pop((1, 7), None)
+        elif packet.dev == 5 and packet.cmd != 1:  # Any sound starts playing.
+            self._shadow.pop((5, 1), None)
+        if key in self.SHADOWED_SETTERS:
+            self._shadow[key] = packet.payload
+
+    def _is_shadowed(self, dev: int, cmd: int, payload: bytes = bytes()) -> bool:
+        """True (and counted as a suppressed write) if the robot is already known to be in this setter state."""
+        if self._shadow.get((dev, cmd)) == payload + bytes(Packet.PAYLOAD_LEN - len(payload)):
+            self.suppressed_writes += 1
+            return True
+        return False
+
+    def invalidate_shadow(self):
+        """Forget the last sent setter values, so that the next call of each setter is sent again."""
+        self._shadow.clear()
+
+    def _sensor_updated(self, sensor: Timestamped):
+        """Stamp a getter with its receive time."""
+        sensor.stamp()
+
+    def _subscribe_events(self, dev: int):
+        """Add a reference to events from device dev (a handler or stream)."""
+        self._event_refs[dev] = self._event_refs.get(dev, 0) + 1
+        if self._event_refs[dev] == 1:
+            self._event_subscriptions_changed()
+
+    def _unsubscribe_events(self, dev: int):
+        count = self._event_refs.get(dev, 0) - 1
+        if count > 0:
+            self._event_refs[dev] = count
+        else:
+            self._event_refs.pop(dev, None)
+            self._event_subscriptions_changed()
+
+    def _stream_events(self, dev: int):
+        """Keep events from device dev enabled from now on, for getters that read its cached state."""
+        if dev not in self._event_streams:
+            self._event_streams.add(dev)
+            self._subscribe_events(dev)
+
+    def _event_subscriptions_changed(self):
+        # Coalesce changes made in the same loop iteration into a single update.
+        if Robot._run and self.auto_events and self._events_sync is None:
+            self._events_sync = self._loop.create_task(self.sync_events())
+
+    def _wanted_events(self) -> int:
+        bitfield = 0
+        for dev in list(self._event_refs) + list(self.ALWAYS_ENABLED_EVENTS):
+            bitfield |= 1 << dev
+        return bitfield
+
+    async def sync_events(self):
+        """Enable events for devices that have handlers, streams or waiters, and disable all others."""
+        self._events_sync = None
+        async with self._events_lock:
+            wanted = self._wanted_events()
+            while wanted != self._enabled_events:  # Subscriptions may change while the packets are sent.
+                await self.enable_events(wanted.to_bytes(16, 'big'))
+                await self.disable_events((~wanted & ((1 << 128) - 1)).to_bytes(16, 'big'))
+                self._enabled_events = wanted
+                wanted = self._wanted_events()
+
+    async def _round_trip(self, sensor: Timestamped, max_age: Optional[float], request: Callable[[], Awaitable]):
+        """Await request(), which asks the robot for a fresh value of sensor.
+        Callers passing max_age share a request that is already in flight for the same sensor."""
+        if max_age is None:
+            return await request()
+        task = self._in_flight.get(sensor)
+        if task is None:
+            task = self._loop.create_task(request())
+            self._in_flight[sensor] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(sensor, None))
+        return await asyncio.shield(task)
+
     async def _read_packets(self):
         """Reads and parses packets from robot."""
-        while Robot._run and await self._backend.is_connected():
-            await asyncio.sleep(0)  # Yield.
+        while Robot._run:
+            if not await self._backend.is_connected():
+                if not (self.auto_reconnect and await self._reconnect()):
+                    return
+            await asyncio.sleep(0)  # Yield between packets; read_packet() itself sleeps until one arrives.
             packet = await self._backend.read_packet()
-            self._decode_packet(packet)
+            if packet is not None:  # None: the backend noticed the link drop.
+                self._decode_packet(packet)
+
+    async def _reconnect(self) -> bool:
+        """Reconnect with exponential back-off, then restore the session. False if the program stopped first."""
+        print('Connection lost, reconnecting')
+        start = monotonic()
+        delay = self.RECONNECT_DELAY
+        while Robot._run:
+            self._reconnect_attempts += 1
+            try:
+                await self._backend.disconnect()
+            except Exception:
+                pass  # Cleaning up the dropped link may fail too.
+            try:
+                await self._backend.connect()
+            except Exception as e:
+                print(f'Reconnect failed: {e}')
+            if await self._backend.is_connected():
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        else:
+            return False
+        self._reconnect_times.append(monotonic() - start)
+        print(f'Reconnected after {self._reconnect_times[-1]:.1f} s')
+        await self._resume_session()
+        return True
+
+    async def _resume_session(self):
+        """Bring a reconnected robot back to the state the program set up, as far as it is safe to repeat."""
+        self._enabled_events = None
+        if self.auto_events:
+            await self.sync_events()
+        shadow = dict(self._shadow)
+        self._shadow.clear()
+        for key in self.RESTORED_SETTERS:
+            if key in shadow:
+                await self._write_packet(Packet(key[0], key[1], self.inc, shadow[key]))
+
+        for key, completer in list(self._responses.items()):
+            packet = self._sent_requests.pop(key, None)
+            if packet is not None and key[:2] in self.IDEMPOTENT_REQUESTS:
+                self._requests_resent += 1
+                await self._write_packet(packet)
+            else:
+                self._requests_failed += 1
+                del self._responses[key]
+                completer.complete(None)
+
+    def reconnect_stats(self):
+        """Number of reconnects and attempts, mean/max seconds to reconnect, and pending requests resent or failed."""
+        times = self._reconnect_times
+        return {
+            'reconnects': len(times),
+            'attempts': self._reconnect_attempts,
+            'mean_time': sum(times) / len(times) if times else 0.0,
+            'max_time': max(times) if times else 0.0,
+            'requests_resent': self._requests_resent,
+            'requests_failed': self._requests_failed,
+        }
 
     async def _main(self):
         # Connect to robot.
@@ -197,6 +429,10 @@ class Robot:
         # Always resets the robot's state before starting the user's program.
         await self.stop()
 
+        # Only stream the events the program uses.
+        if self.auto_events:
+            await self.sync_events()
+
         # The when_play event is always triggered first.
         for event in self._when_play:
             if not event.is_running:
@@ -210,6 +446,7 @@ class Robot:
     # Event Handlers.
 
     async def _when_stop_button_handler(self, packet: Packet):
+        self.invalidate_shadow()
         Robot._run = False
         for r in Robot.robots:
             stop_program = getattr(r._backend, 'stop_program', None)  # Events based backend?
@@ -220,8 +457,10 @@ class Robot:
 
     async def _when_motor_stalled_handler(self, packet: Packet):
         self._disable_motors = True
+        self.invalidate_shadow()
         self.motor_stall.motor = packet.payload[4]
         self.motor_stall.cause = packet.payload[5]
+        self._sensor_updated(self.motor_stall)
 
         for event in self._when_motor_stalled:
             await event.run(self)
@@ -230,6 +469,7 @@ class Robot:
         if len(packet.payload) > 4:
             self.bumpers.left = packet.payload[4] & 0x80 != 0
             self.bumpers.right = packet.payload[4] & 0x40 != 0
+            self._sensor_updated(self.bumpers)
 
             for event in self._when_bumped:
                 # An empty condition list means to trigger the event on every occurrence.
@@ -242,6 +482,7 @@ class Robot:
     async def _when_battery_handler(self, packet: Packet):
         self.battery.millivolts = unpack('>H', packet.payload[4:6])[0]
         self.battery.percent = packet.payload[6]
+        self._sensor_updated(self.battery)
 
         for event in self._when_battery:
             # TODO: Add trigger? Probably not necessary.
@@ -253,6 +494,7 @@ class Robot:
             self.touch_sensors.front_right = packet.payload[4] & 0x40 != 0
             self.touch_sensors.back_right = packet.payload[4] & 0x20 != 0
             self.touch_sensors.back_left = packet.payload[4] & 0x10 != 0
+            self._sensor_updated(self.touch_sensors)
 
             for event in self._when_touched:
                 # An empty condition list means to trigger the event on every occurrence.
@@ -278,6 +520,9 @@ class Robot:
             self.cliff_sensor.front_right = packet.payload[4] & 0x02 != 0
             self.cliff_sensor.front_left = packet.payload[4] & 0x04 != 0
             self.cliff_sensor.left = packet.payload[4] & 0x08 != 0
+            self._sensor_updated(self.cliff_sensor)
+            if self.cliff_sensor.disable_motors:
+                self.invalidate_shadow()
 
             for event in self._when_cliff_sensor:
                 # An empty condition list means to trigger the event on every occurrence.
@@ -306,22 +551,27 @@ class Robot:
     def when_motor_stalled(self, condition: list[int, int], callback: Callable[[MotorStall], Awaitable[None]]):
         """Register when motor stall callback of type async def fn(motor: Motor, stall: Stall)."""
         self._when_motor_stalled.append(Event(condition, callback))
+        self._subscribe_events(1)
 
     def when_bumped(self, condition: list[bool, bool], callback: Callable[[Bumpers], Awaitable[None]]):
         """Register when bumper callback of type: async def fn(left: bool, right: bool)."""
         self._when_bumped.append(Event(condition, callback))
+        self._subscribe_events(12)
 
     def when_battery(self, condition: list[int, int], callback: Callable[[Battery], Awaitable[None]]):
         """Register when battery callback of type: async def fn(mV: int, percent: int)."""
         self._when_battery.append(Event(condition, callback))
+        self._subscribe_events(14)
 
     def when_touched(self, condition: list[bool, bool, bool, bool], callback: Callable[[TouchSensors], Awaitable[None]]):
         """Register when touch callback of type: async def fn(front_left: bool, front_right: bool, back_left: bool, back_right: bool)."""
         self._when_touched.append(Event(condition, callback))
+        self._subscribe_events(17)
 
     def when_cliff_sensor(self, condition: list[bool, bool, bool, bool], callback: Callable[[bool], Awaitable[None]]):
         """Register when cliff callback of type: async def fn(over_cliff: bool)."""
         self._when_cliff_sensor.append(Event(condition, callback))
+        self._subscribe_events(20)
 
     # Commands.
 
@@ -358,7 +608,9 @@ class Robot:
 
     async def stop(self):
         """Stop and reset robot."""
-        await self._backend.write_packet(Packet(0, 3, self.inc))
+        self.wheel_stream.clear()
+        self.motion.clear()
+        await self._write_packet(Packet(0, 3, self.inc))
 
     # TODO: Evaluate if this one needs to be async (most likely not)
     def stop_all_events(self):
@@ -372,18 +624,37 @@ class Robot:
 
     async def stop_sound(self):
         """Stop currently playing note."""
-        await self._backend.write_packet(Packet(5, 1, self.inc))
         self.sound_enabled = False
+        if self._is_shadowed(5, 1):
+            return
+        await self._write_packet(Packet(5, 1, self.inc))
 
     async def wait(self, time: Union[int, float]):
         await asyncio.sleep(time)
 
+    def poll(self, name: str, hz: float):
+        """Sample a getter ('accelerometer', 'battery', 'position', 'light', 'ir_proximity') hz times per second
+        from a shared scheduler; hz=0 stops. Read results with the getter and max_age, e.g.
+        get_accelerometer(max_age=0.1), and achieved rates with poller.stats()."""
+        self.poller.poll(name, hz)
+
+    async def offload(self, func: Callable, *args, executor: str = 'thread'):
+        """Run a CPU-heavy function in a 'thread' or 'process' pool and return its result,
+        while packets from every robot keep being processed."""
+        from .offload import offloader
+        return await offloader.run(executor, func, *args)
+
+    def offload_stats(self):
+        """Pool size and queue depth of the pools used by offload() and @event(..., executor=...)."""
+        from .offload import offloader
+        return offloader.stats()
+
     async def get_versions(self, board: int) -> List[int]:
         """Get version numbers. Returns [board, fw maj, fw min, hw maj, hw min, boot maj, boot min, proto maj, proto min, patch]."""
         dev, cmd, inc = 0, 0, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, bytes([board])))
+        await self._write_packet(Packet(dev, cmd, inc, bytes([board])))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         return packet.payload[: 10] if packet else []
 
@@ -393,35 +664,37 @@ class Robot:
         while len(utf) > Packet.PAYLOAD_LEN:
             name = name[: -1]
             utf = name.encode('utf-8')
-        await self._backend.write_packet(Packet(0, 1, self.inc, utf))
+        await self._write_packet(Packet(0, 1, self.inc, utf))
 
     async def get_name(self) -> str:
         """Get robot name."""
         dev, cmd, inc = 0, 2, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         return packet.payload.decode('utf-8').rstrip('\0') if packet else ''
 
     async def disconnect(self):
         """Disconnect Bluetooth from robot side."""
-        await self._backend.write_packet(Packet(0, 6, self.inc))
+        await self._write_packet(Packet(0, 6, self.inc))
 
     async def enable_events(self, bitfield: bytes):
         """Enable notifications for events. Accepts 128-bit bitfield for devices 0 to 127."""
-        await self._backend.write_packet(Packet(0, 7, self.inc, bitfield))
+        self._enabled_events = None
+        await self._write_packet(Packet(0, 7, self.inc, bitfield))
 
     async def disable_events(self, bitfield: bytes):
         """Disable notifications for events. Accepts 128-bit bitfield for devices 0 to 127."""
-        await self._backend.write_packet(Packet(0, 9, self.inc, bitfield))
+        self._enabled_events = None
+        await self._write_packet(Packet(0, 9, self.inc, bitfield))
 
     async def get_enabled_events(self) -> bytes:
         """Return 128-bit bitfield for devices 0 to 127."""
         dev, cmd, inc = 0, 11, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         return packet.payload if packet else bytes()
 
@@ -430,7 +703,7 @@ class Robot:
         dev, cmd, inc = 0, 14, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         try:
             return packet.payload.decode('utf-8').rstrip('\0') if packet else ''
@@ -442,19 +715,29 @@ class Robot:
         dev, cmd, inc = 0, 15, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         return packet.payload.decode('utf-8').rstrip('\0') if packet else ''
 
-    async def get_battery_level(self) -> Tuple[int, int]:
-        # TODO: Update robot's getter.
-        # Get battery level. Returns (mV, percent)
+    async def get_battery_level(self, max_age: Optional[float] = None) -> Tuple[int, int]:
+        """Get battery level. Returns (mV, percent).
+        If max_age is given (in seconds), a level received that recently is returned without asking the robot."""
+        if max_age is not None and self.battery.is_fresh(max_age):
+            return (self.battery.millivolts, self.battery.percent)
+        return await self._round_trip(self.battery, max_age, self._request_battery_level)
+
+    async def _request_battery_level(self) -> Tuple[int, int]:
         dev, cmd, inc = 14, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
-        return (unpack(">H", packet.payload[4:6])[0], packet.payload[6]) if packet else (0, 0)
+        if packet:
+            self.battery.millivolts = unpack(">H", packet.payload[4:6])[0]
+            self.battery.percent = packet.payload[6]
+            self._sensor_updated(self.battery)
+            return (self.battery.millivolts, self.battery.percent)
+        return (0, 0)
 
     async def set_wheel_speeds(self, left: Union[int, float], right: Union[int, float]):
         """Set motor speed in cm/s."""
@@ -462,21 +745,30 @@ class Robot:
             return
         left = bound(int(left * 10), -self.MAX_SPEED, self.MAX_SPEED)
         right = bound(int(right * 10), -self.MAX_SPEED, self.MAX_SPEED)
-        await self._backend.write_packet(Packet(1, 4, self.inc, pack('>ii', left, right)))
+        await self._write_packet(Packet(1, 4, self.inc, pack('>ii', left, right)))
+
+    def stream_wheel_speeds(self, left: Union[int, float], right: Union[int, float]):
+        """Update the target motor speeds in cm/s without waiting, for loops that call it at any rate.
+        Only the latest target is sent, at most once per wheel_stream.interval seconds."""
+        self.wheel_stream.set(left, right)
 
     async def set_left_speed(self, speed: Union[int, float]):
         """Set left motor speed in cm/s."""
         if self._disable_motors:
             return
         speed = bound(int(speed * 10), -self.MAX_SPEED, self.MAX_SPEED)
-        await self._backend.write_packet(Packet(1, 6, self.inc, pack('>i', speed)))
+        if self._is_shadowed(1, 6, pack('>i', speed)):
+            return
+        await self._write_packet(Packet(1, 6, self.inc, pack('>i', speed)))
 
     async def set_right_speed(self, speed: Union[int, float]):
         """Set right motor speed in cm/s."""
         if self._disable_motors:
             return
         speed = bound(int(speed * 10), -self.MAX_SPEED, self.MAX_SPEED)
-        await self._backend.write_packet(Packet(1, 7, self.inc, pack('>i', speed)))
+        if self._is_shadowed(1, 7, pack('>i', speed)):
+            return
+        await self._write_packet(Packet(1, 7, self.inc, pack('>i', speed)))
 
     async def move(self, distance: Union[int, float]):
         """Drive distance in centimeters."""
@@ -486,7 +778,7 @@ class Robot:
         packet = Packet(dev, cmd, inc, pack('>i', int(distance * 10)))
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(packet)
+        await self._write_packet(packet)
         packet = await completer.wait(self.DEFAULT_TIMEOUT + int(abs(distance) / 10))
         if self.USE_ROBOT_POSE and packet:
             return self.pose.set_from_packet(packet)
@@ -509,7 +801,7 @@ class Robot:
         packet = Packet(dev, cmd, inc, pack('>i', int(angle * 10)))
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(packet)
+        await self._write_packet(packet)
         packet = await completer.wait(self.DEFAULT_TIMEOUT + int(abs(angle) / 100))
         if self.USE_ROBOT_POSE and packet:
             return self.pose.set_from_packet(packet)
@@ -529,25 +821,35 @@ class Robot:
     async def reset_navigation(self):
         """Request that robot resets position and heading."""
         if self.USE_ROBOT_POSE:
-            await self._backend.write_packet(Packet(1, 15, self.inc))
+            await self._write_packet(Packet(1, 15, self.inc))
         self.pose.set(0, 0, 90)
 
-    async def get_position(self):
+    async def get_position(self, max_age: Optional[float] = None):
         """Get robot's position and heading.
+        If max_age is given (in seconds), the pose last reported by the robot within that time is extrapolated
+        with the commanded wheel speeds, and the robot is only asked again when the estimate's uncertainty
+        exceeds pose_estimator.max_uncertainty. Such estimates also carry a covariance.
         Units:
             x, y: cm
             heading: deg
         """
         if self.USE_ROBOT_POSE:
-            dev, cmd, inc = 1, 16, self.inc
-            completer = Completer()
-            self._responses[(dev, cmd, inc)] = completer
-            await self._backend.write_packet(Packet(dev, cmd, inc))
-            packet = await completer.wait(self.DEFAULT_TIMEOUT)
-            return self.pose.set_from_packet(packet)
+            if max_age is not None:
+                estimate = self.pose_estimator.predict(max_age)
+                if estimate is not None:
+                    return estimate
+            return await self._round_trip(self.pose, max_age, self._request_position)
         else:
             return self.pose
 
+    async def _request_position(self):
+        dev, cmd, inc = 1, 16, self.inc
+        completer = Completer()
+        self._responses[(dev, cmd, inc)] = completer
+        await self._write_packet(Packet(dev, cmd, inc))
+        packet = await completer.wait(self.DEFAULT_TIMEOUT)
+        return self.pose.set_from_packet(packet)
+
     async def arc(self, direction: int, angle: Union[int, float], radius: Union[int, float]):
         """Drive arc defined by angle in degrees and radius in cm."""
         if self._disable_motors:
@@ -559,7 +861,7 @@ class Robot:
         payload = pack('>ii', int(angle * 10), int(radius * 10))
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, payload))
+        await self._write_packet(Packet(dev, cmd, inc, payload))
 
         timeout = abs(radians(angle) * (abs(radius * 10) + 51.5)) / 100
         packet = await completer.wait(15 + timeout)
@@ -581,7 +883,9 @@ class Robot:
         color.green = bound(color.green, 0, 255)
         color.blue = bound(color.blue, 0, 255)
         payload = bytes([animation, color.red, color.green, color.blue])
-        await self._backend.write_packet(Packet(3, 2, self.inc, payload))
+        if self._is_shadowed(3, 2, payload):
+            return
+        await self._write_packet(Packet(3, 2, self.inc, payload))
 
     async def set_lights_off(self):
         await self.set_lights(Robot.LightPattern.OFF)
@@ -604,7 +908,7 @@ class Robot:
         payload = pack('>IH', abs(int(frequency)), abs(int(duration * 1000)))
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, payload))
+        await self._write_packet(Packet(dev, cmd, inc, payload))
         await completer.wait(self.DEFAULT_TIMEOUT + int(abs(duration)))
 
     async def play_tone(self, frequency: Union[float, int], duration: Union[float, int]):
@@ -653,42 +957,57 @@ class Robot:
                 dev, cmd, inc = 5, 4, self.inc
                 completer = Completer()
                 self._responses[(dev, cmd, inc)] = completer
-                await self._backend.write_packet(Packet(dev, cmd, inc, payload))
+                await self._write_packet(Packet(dev, cmd, inc, payload))
                 await completer.wait(self.DEFAULT_TIMEOUT + len(payload))
                 break
 
     def get_bumpers_cached(self):
-        '''Returns tuple of most recently seen bumper state, or None if no event has happened yet'''
+        '''Returns tuple of most recently seen bumper state, or None if no event has happened yet.
+           Events only come when the state changes, so while they are enabled (from the first call on) the
+           cached state is current however old it is; self.bumpers.received is when it arrived.
+        '''
+        self._stream_events(12)
         return (self.bumpers.left, self.bumpers.right)
 
     async def get_bumpers(self):
         '''Returns tuple of most recently seen bumper state, or None if no event has happened yet.
-           If there were a protocol getter, this would await that response when the cache is empty.
+           Same as get_bumpers_cached(): there is no protocol getter to wait for.
         '''
         return self.get_bumpers_cached()
 
-    async def get_accelerometer(self):
-        """Get instantaneous accelerometer values"""
+    async def get_accelerometer(self, max_age: Optional[float] = None):
+        """Get instantaneous accelerometer values.
+        If max_age is given (in seconds), values received that recently are returned without asking the robot."""
+        if max_age is not None and self.accelerometer.is_fresh(max_age):
+            return (self.accelerometer.x, self.accelerometer.y, self.accelerometer.z)
+        return await self._round_trip(self.accelerometer, max_age, self._request_accelerometer)
+
+    async def _request_accelerometer(self):
         dev, cmd, inc = 16, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
 
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             payload = packet.payload
             timestamp = unpack('>I', payload[0:4])[0]
             (x,y,z) = unpack('>hhh', payload[4:10])
+            self.accelerometer.x, self.accelerometer.y, self.accelerometer.z = x, y, z
+            self._sensor_updated(self.accelerometer)
             return (x,y,z)
         return None
 
     def get_touch_sensors_cached(self):
-        '''Returns tuple of most recently seen touch sensor state, or None if no event has happened yet'''
+        '''Returns tuple of most recently seen touch sensor state, or None if no event has happened yet.
+           Current however old it is, like get_bumpers_cached(); self.touch_sensors.received is when it arrived.
+        '''
+        self._stream_events(17)
         return (self.touch_sensors.front_left, self.touch_sensors.front_right,
                 self.touch_sensors.back_left,  self.touch_sensors.back_right)
 
     async def get_touch_sensors(self):
         '''Returns tuple of most recently seen touch sensor state, or None if no event has happened yet.
-           If there were a protocol getter, this would await that response when the cache is empty.
+           Same as get_touch_sensors_cached(), like get_bumpers().
         '''
         return self.get_touch_sensors_cached()
@@ -4,7 +4,7 @@
 
 import math
 from enum import IntEnum
-from typing import Union, Callable, Awaitable, List
+from typing import Union, Callable, Awaitable, List, Optional
 from struct import pack, unpack
 from .backend.backend import Backend
 from .event import Event
@@ -117,6 +117,7 @@ class Root(Robot):
 
     async def _when_color_scanned_handler(self, packet: Packet):
         self.color_sensor.colors = [Root.ColorID(c >> i & 0xF) for c in packet.payload for i in range(4, -1, -4)]
+        self._sensor_updated(self.color_sensor)
 
         for event in self._when_color_scanned:
             # Trigger matching events based on parsed colors
@@ -127,6 +128,7 @@ class Root(Robot):
         self.light_sensors.state = packet.payload[4]
         self.light_sensors.left = unpack(">H", packet.payload[5:7])[0]
         self.light_sensors.right = unpack(">H", packet.payload[7:9])[0]
+        self._sensor_updated(self.light_sensors)
 
         for event in self._when_light_seen:
             if len(event.condition) == 1:
@@ -139,10 +141,12 @@ class Root(Robot):
         """Register when color callback of type async def fn(colors:
         List[Color])"""
         self._when_color_scanned.append(Event(ColorSensor(condition), callback))
+        self._subscribe_events(4)
 
     def when_light_seen(self, condition: list[int, int, int], callback: Callable[[LightSensors], Awaitable[None]]):
         """Register when light callback of type: async def fn(state: Light, left_mV: int, right_mV: int)"""
         self._when_light_seen.append(Event(condition, callback))
+        self._subscribe_events(13)
 
     # Commands.
 
@@ -162,9 +166,11 @@ class Root(Robot):
             return
         dev, cmd, inc = 2, 0, self.inc
         payload = bytes([bound(position, self.MarkerPos.UP, self.MarkerPos.ERASE)])
+        if self._is_shadowed(dev, cmd, payload):
+            return
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, payload))
+        await self._write_packet(Packet(dev, cmd, inc, payload))
         await completer.wait(self.DEFAULT_TIMEOUT)
 
     async def set_marker_up(self):
@@ -186,7 +192,9 @@ class Root(Robot):
         """Set vertical driving compensation for gravity and amount between 0% and 100%"""
         gravity = bound(gravity, Root.GravityComp.OFF, Root.GravityComp.WHEN_MARKER)
         amount = bound(int(amount * 10), 0, 1000)
-        await self._backend.write_packet(Packet(1, 13, self.inc, pack(">BH", gravity, amount)))
+        if self._is_shadowed(1, 13, pack(">BH", gravity, amount)):
+            return
+        await self._write_packet(Packet(1, 13, self.inc, pack(">BH", gravity, amount)))
 
     async def compute_movement_to(self, x, y):
         await self.get_position()
@@ -216,18 +224,26 @@ class Root(Robot):
             except IndexError:
                 return None;
 
-    async def get_light_values(self):
-        """Get instantaneous ambient light sensor values"""
+    async def get_light_values(self, max_age: Optional[float] = None):
+        """Get instantaneous ambient light sensor values.
+        If max_age is given (in seconds), values received that recently are returned without asking the robot."""
+        if max_age is not None and self.light_sensors.is_fresh(max_age):
+            return (self.light_sensors.left / 1000, self.light_sensors.right / 1000)
+        return await self._round_trip(self.light_sensors, max_age, self._request_light_values)
+
+    async def _request_light_values(self):
         dev, cmd, inc = 13, 1, self.inc
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc))
+        await self._write_packet(Packet(dev, cmd, inc))
 
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
             payload = packet.payload
             timestamp = unpack('>I', payload[0:4])[0]
             (l, r) = unpack('>HH', payload[4:8])
+            self.light_sensors.left, self.light_sensors.right = l, r
+            self._sensor_updated(self.light_sensors)
             return (l / 1000, r / 1000) # normalize between 0 and 1
         return None
 
@@ -239,7 +255,7 @@ class Root(Robot):
         data_format = bound(data_format, Root.ColorFormat.ADC_COUNTS, Root.ColorFormat.MILLIVOLTS)
         completer = Completer()
         self._responses[(dev, cmd, inc)] = completer
-        await self._backend.write_packet(Packet(dev, cmd, inc, pack(">BBB", bank, lighting, data_format)))
+        await self._write_packet(Packet(dev, cmd, inc, pack(">BBB", bank, lighting, data_format)))
 
         packet = await completer.wait(self.DEFAULT_TIMEOUT)
         if packet:
@@ -261,27 +277,31 @@ class Root(Robot):
         return tuple(values)
 
     def get_color_ids_cached(self):
-        '''Returns tuple of most recently seen color sensor IDs, or None if no event has happened yet'''
+        '''Returns tuple of most recently seen color sensor IDs, or None if no event has happened yet.
+           Current however old they are, like get_bumpers_cached(); self.color_sensor.received is when they arrived.
+        '''
+        self._stream_events(4)
         return tuple(self.color_sensor.colors) if self.color_sensor.colors != [] else None
 
     async def get_color_ids(self):
         '''Returns tuple of most recently seen color sensor IDs, or None if no event has happened yet.
-           If there were a protocol getter, this would await that response when the cache is empty.
+           Same as get_color_ids_cached(), like get_bumpers().
         '''
         return self.get_color_ids_cached()
 
     def get_cliff_sensors_cached(self):
-        '''Returns tuple of most recently seen cliff sensor state'''
+        '''Returns tuple of most recently seen cliff sensor state.
+           Current however old it is, like get_bumpers_cached(); self.cliff_sensor.received is when it arrived.
+        '''
+        self._stream_events(20)
         return (self.cliff_sensor.disable_motors)
 
     async def get_cliff_sensors(self):
         '''Returns tuple of most recently seen cliff sensor state.
-           If there were a protocol getter, this would await that response when the cache is empty.
+           Same as get_cliff_sensors_cached(), like get_bumpers().
         '''
         return self.get_cliff_sensors_cached()
 
     async def get_cliff_sensor(self):
-        '''Returns tuple of most recently seen cliff sensor state.
-           If there were a protocol getter, this would await that response when the cache is empty.
-        '''
-        return self.get_cliff_sensors_cached()
+        '''Returns tuple of most recently seen cliff sensor state. Same as get_cliff_sensors().'''
+        return await self.get_cliff_sensors()
@@ -0,0 +1,91 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Latest-wins streaming channel for wheel speeds, for teleop and tilt-control loops that
+update their target as fast as they can spin.
+"""
+
+try:
+    import asyncio
+    from typing import Optional, Tuple, Union
+    from time import monotonic
+except ImportError:
+    import uasyncio as asyncio
+    from time import time as monotonic
+from struct import pack
+
+from .packet import Packet
+from .utils import bound
+
+
+class WheelSpeedStream:
+    """Sends at most one Set Motor Speeds packet per `interval` seconds, always the latest target.
+    An unchanged target is only resent every `keepalive` seconds (never if None) while the robot is moving."""
+
+    def __init__(self, robot, interval: float = 0.05, keepalive: Optional[float] = 1.0):
+        self._robot = robot
+        self.interval = interval
+        self.keepalive = keepalive
+        self._target: Optional[Tuple[int, int]] = None
+        self._sent_value: Optional[Tuple[int, int]] = None
+        self._sent_time = 0.0
+        self._changed = None
+        self._task = None
+        self.updates = 0
+        self.sent = 0
+
+    def set(self, left: Union[int, float], right: Union[int, float]):
+        """Update the target speeds in cm/s. Returns immediately."""
+        left = bound(int(left * 10), -self._robot.MAX_SPEED, self._robot.MAX_SPEED)
+        right = bound(int(right * 10), -self._robot.MAX_SPEED, self._robot.MAX_SPEED)
+        self._target = (left, right)
+        self.updates += 1
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._changed.set()
+        if self._task is None or self._task.done():
+            self._task = self._robot._loop.create_task(self._run())
+
+    def clear(self):
+        """Forget the target without sending anything, e.g. because the robot was stopped."""
+        self._target = None
+        self._sent_value = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _keepalive_due(self) -> Optional[float]:
+        if self.keepalive is None or self._sent_value == (0, 0):
+            return None
+        return self._sent_time + self.keepalive
+
+    async def _run(self):
+        while self._target is not None:
+            if self._robot._disable_motors:
+                # Stalled: nothing can be sent, so sleep until the next set() or clear() instead of polling.
+                self._changed.clear()
+                await self._changed.wait()
+                continue
+            due = self._keepalive_due()
+            if self._target != self._sent_value or (due is not None and monotonic() >= due):
+                await self._send(self._target)
+                await asyncio.sleep(self.interval)
+                continue
+
+            if due is None and self._sent_value == (0, 0):
+                return  # Stopped; the next set() starts a new task.
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), None if due is None else max(0, due - monotonic()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, target: Tuple[int, int]):
+        if self._robot._disable_motors:
+            return
+        self._sent_value = target
+        self._sent_time = monotonic()
+        self.sent += 1
+        await self._robot._write_packet(Packet(1, 4, self._robot.inc, pack('>ii', *target)))
@@ -0,0 +1,303 @@
+#
+# Licensed under 3-Clause BSD license available in the License file. Copyright (c) 2024 iRobot Corporation. All rights reserved.
+#
+
+"""
+Summarizes packet traces recorded with the Recorder backend:
+
+    python -m irobot_edu_sdk.trace session.trace
+    python -m irobot_edu_sdk.trace session.trace --start 3600 --end 3660 --format json
+
+Reports packet counts and rates per command and event, request/response latencies (requests matched to
+the next response with the same dev, cmd and inc), timeouts, CRC failures, event burst sizes and gaps in
+the traffic, as text tables and latency histograms, CSV or JSON.
+
+Records are decoded a block at a time into NumPy arrays, so this needs NumPy (the "trace" extra).
+"""
+
+import argparse
+import csv
+import json
+import sys
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .backend.trace_file import DROP, RX, TX, TraceReader
+
+# Requests and other commands sent by the SDK, as (dev, cmd): (name, whether the robot responds).
+COMMANDS: Dict[Tuple[int, int], Tuple[str, bool]] = {
+    (0, 0): ('get_versions', True),
+    (0, 1): ('set_name', False),
+    (0, 2): ('get_name', True),
+    (0, 3): ('stop', False),
+    (0, 6): ('disconnect', False),
+    (0, 7): ('enable_events', False),
+    (0, 9): ('disable_events', False),
+    (0, 11): ('get_enabled_events', True),
+    (0, 14): ('get_serial_number', True),
+    (0, 15): ('get_sku', True),
+    (1, 4): ('set_wheel_speeds', False),
+    (1, 6): ('set_left_speed', False),
+    (1, 7): ('set_right_speed', False),
+    (1, 8): ('move', True),
+    (1, 12): ('turn', True),
+    (1, 13): ('set_gravity_compensation', False),
+    (1, 15): ('reset_navigation', False),
+    (1, 16): ('get_position', True),
+    (1, 17): ('navigate_to', True),
+    (1, 19): ('dock', True),
+    (1, 20): ('undock', True),
+    (1, 27): ('arc', True),
+    (2, 0): ('set_marker', True),
+    (3, 2): ('set_lights', False),
+    (4, 1): ('get_color_section', True),
+    (5, 0): ('play_note', True),
+    (5, 1): ('stop_sound', False),
+    (5, 4): ('say', True),
+    (11, 1): ('get_6x_ir_proximity', True),
+    (11, 2): ('get_7x_ir_proximity', True),
+    (13, 1): ('get_light_values', True),
+    (14, 1): ('get_battery_level', True),
+    (16, 1): ('get_accelerometer', True),
+    (19, 1): ('get_docking_values', True),
+    (100, 1): ('get_ipv4_address', True),
+}
+
+# Responses to these come when the robot has finished, so they are not counted as timeouts.
+COMPLETES_WHEN_DONE = {(1, 8), (1, 12), (1, 17), (1, 19), (1, 20), (1, 27), (2, 0), (5, 0), (5, 4)}
+
+EVENTS: Dict[Tuple[int, int], str] = {
+    (0, 4): 'stop_button',
+    (1, 29): 'motor_stalled',
+    (4, 2): 'color_scanned',
+    (12, 0): 'bumped',
+    (13, 0): 'light_seen',
+    (14, 0): 'battery',
+    (17, 0): 'touched',
+    (19, 0): 'docking_sensor',
+    (20, 0): 'cliff_sensor',
+}
+
+HISTOGRAM_EDGES_MS = [0.5 * 2 ** i for i in range(15)]  # 0.5 ms to 8 s.
+PERCENTILES = (50, 90, 99)
+
+
+def packet_name(direction: int, dev: int, cmd: int) -> str:
+    if direction == RX and (dev, cmd) in EVENTS:
+        return 'event ' + EVENTS[(dev, cmd)]
+    name = COMMANDS.get((dev, cmd), (f'{dev},{cmd}', False))[0]
+    return name if direction == TX else name + ' response'
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07 if crc & 0x80 else crc << 1) & 0xFF
+        table.append(crc)
+    return np.array(table, dtype=np.uint8)
+
+
+def load(path: str, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+    """The records of a trace (from start to end seconds) as columns: t (ns since the trace started), dir, dev,
+    cmd, inc and crc_ok. Only the blocks that can hold records in that span are decoded."""
+    record = np.dtype([('us', '<u4'), ('dir', 'u1'), ('dev', 'u1'), ('cmd', 'u1'), ('inc', 'u1'),
+                       ('payload', 'V16'), ('crc', 'u1')])
+    table = _crc_table()
+    columns = {name: [] for name in ('t', 'dir', 'dev', 'cmd', 'inc', 'crc_ok')}
+    with TraceReader(path) as trace:
+        for block_start, payload in trace.raw_blocks(start or 0.0, end):
+            records = np.frombuffer(payload, record)
+            raw = np.frombuffer(payload, np.uint8).reshape(-1, record.itemsize)
+            crc = np.zeros(len(raw), np.uint8)
+            for column in range(5, 24):  # dev, cmd, inc and payload
+                crc = table[crc ^ raw[:, column]]
+            columns['t'].append(block_start + records['us'].astype(np.int64) * 1000)
+            columns['crc_ok'].append((crc == records['crc']) | (records['dir'] == DROP))
+            for name in ('dir', 'dev', 'cmd', 'inc'):
+                columns[name].append(records[name])
+        info = {'path': path, 'complete': trace.complete, 'wall_start': trace.wall_start}
+    for name, parts in columns.items():
+        columns[name] = np.concatenate(parts) if parts else np.zeros(0, np.int64 if name == 't' else np.uint8)
+    if start is not None or end is not None:
+        t = columns['t']
+        keep = np.ones(len(t), bool)
+        if start is not None:
+            keep &= t >= int(start * 1e9)
+        if end is not None:
+            keep &= t <= int(end * 1e9)
+        columns = {name: column[keep] for name, column in columns.items()}
+    columns['info'] = info
+    return columns
+
+
+def _percentiles(values_ms) -> dict:
+    if not len(values_ms):
+        return {}
+    stats = {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(values_ms, PERCENTILES))}
+    stats['max'] = float(values_ms.max())
+    return stats
+
+
+def analyze(columns: dict, timeout: float = 3.0, gap: float = 1.0, burst_gap: float = 0.005, top_gaps: int = 10) -> dict:
+    """Summary of the columns returned by load(). timeout: seconds after which a request counts as unanswered.
+    gap: silences longer than this many seconds are reported. burst_gap: events closer than this form a burst."""
+    t, direction, dev, cmd, inc, ok = (columns[name] for name in ('t', 'dir', 'dev', 'cmd', 'inc', 'crc_ok'))
+    duration = (t[-1] - t[0]) / 1e9 if len(t) > 1 else 0.0
+    pair = dev.astype(np.int32) << 8 | cmd
+    summary = {
+        'info': columns['info'],
+        'records': int(len(t)),
+        'duration': duration,
+        'sent': int((direction == TX).sum()),
+        'received': int((direction == RX).sum()),
+        'drops': [float(s) for s in t[direction == DROP] / 1e9],
+        'crc_failures': {'sent': int((~ok & (direction == TX)).sum()), 'received': int((~ok & (direction == RX)).sum())},
+    }
+
+    # Packets per direction and (dev, cmd).
+    packets = {}
+    key = direction.astype(np.int32) << 16 | pair  # Small integers: counted with bincount rather than unique.
+    counts = np.bincount(key[direction != DROP], minlength=2 << 16)
+    failures = np.bincount(key[~ok], minlength=len(counts))
+    for k in np.flatnonzero(counts).tolist():
+        d, dv, cm = k >> 16, (k >> 8) & 0xFF, k & 0xFF
+        count = int(counts[k])
+        packets[packet_name(d, dv, cm)] = {
+            'direction': 'sent' if d == TX else 'received', 'dev': dv, 'cmd': cm, 'count': count,
+            'rate': count / duration if duration else 0.0, 'crc_failures': int(failures[k])}
+    summary['packets'] = packets
+
+    # Requests matched to the next response with the same dev, cmd and inc.
+    is_event = np.isin(pair, [dv << 8 | cm for dv, cm in EVENTS])
+    responding = np.isin(pair, [dv << 8 | cm for (dv, cm), (_, responds) in COMMANDS.items() if responds])
+    candidate = ok & responding & ((direction == TX) | ((direction == RX) & ~is_event))
+    index = np.flatnonzero(candidate)
+    order = index[np.lexsort((t[index], pair[index] << 8 | inc[index]))]  # By dev, cmd and inc, then time.
+    sorted_key = pair[order] << 8 | inc[order]
+    answered = ((direction[order[:-1]] == TX) & (direction[order[1:]] == RX) & (sorted_key[:-1] == sorted_key[1:]))
+    requests = order[:-1][answered]
+    latency_ms = (t[order[1:]][answered] - t[requests]) / 1e6
+    sent = index[direction[index] == TX]
+    is_answered = np.zeros(len(t), bool)
+    is_answered[requests] = True
+    unanswered = sent[~is_answered[sent]]
+    if len(t):
+        unanswered = unanswered[t[unanswered] < t[-1] - int(timeout * 1e9)]  # Not the ones still pending at the end.
+    latencies = {}
+    for p in np.flatnonzero(np.bincount(pair[sent], minlength=1 << 16)).tolist():
+        dv, cm = p >> 8, p & 0xFF
+        mine = latency_ms[pair[requests] == p]
+        late = 0 if (dv, cm) in COMPLETES_WHEN_DONE else int((mine > timeout * 1000).sum())
+        missing = int((pair[unanswered] == p).sum())
+        latencies[packet_name(TX, dv, cm)] = {
+            'requests': int((pair[sent] == p).sum()), 'responses': int(len(mine)),
+            'timeouts': missing + late, 'mean': float(mine.mean()) if len(mine) else None,
+            **_percentiles(mine),
+            'histogram': np.histogram(mine, [0] + HISTOGRAM_EDGES_MS + [np.inf])[0].tolist()}
+    summary['latency_ms'] = latencies
+
+    # Event bursts: events of one kind less than burst_gap apart.
+    bursts = {}
+    for (dv, cm), name in EVENTS.items():
+        times = t[(direction == RX) & ok & (pair == (dv << 8 | cm))]
+        if not len(times):
+            continue
+        starts = np.flatnonzero(np.diff(times, prepend=times[0] - int(burst_gap * 1e9) - 1) > burst_gap * 1e9)
+        sizes = np.diff(np.append(starts, len(times)))
+        bursts[name] = {'events': int(len(times)), 'bursts': int(len(sizes)), 'mean_size': float(sizes.mean()),
+                        'max_size': int(sizes.max())}
+    summary['event_bursts'] = bursts
+
+    # Silences in the traffic.
+    gaps = np.diff(t)
+    long_gaps = np.flatnonzero(gaps > gap * 1e9)
+    longest = long_gaps[np.argsort(gaps[long_gaps])[::-1][:top_gaps]]
+    summary['gaps'] = {'count': int(len(long_gaps)),
+                       'longest': [{'at': float(t[i] / 1e9), 'seconds': float(gaps[i] / 1e9)} for i in longest]}
+    return summary
+
+
+def print_text(summary: dict, out=sys.stdout):
+    info = summary['info']
+    print(f"{info['path']}: {summary['records']} records over {summary['duration']:.3f} s"
+          f"{'' if info['complete'] else ' (not closed: no index, read up to the last complete block)'}", file=out)
+    print(f"sent {summary['sent']}, received {summary['received']}, CRC failures sent "
+          f"{summary['crc_failures']['sent']} received {summary['crc_failures']['received']}, "
+          f"drops {len(summary['drops'])}", file=out)
+
+    print(f"\n{'packet':<34}{'count':>10}{'per s':>10}{'bad CRC':>9}", file=out)
+    for name, row in sorted(summary['packets'].items(), key=lambda item: -item[1]['count']):
+        print(f"{name:<34}{row['count']:>10}{row['rate']:>10.1f}{row['crc_failures']:>9}", file=out)
+
+    if summary['latency_ms']:
+        print(f"\n{'request (ms)':<26}{'sent':>8}{'answered':>9}{'timeouts':>9}"
+              + ''.join(f'{f"p{p}":>9}' for p in PERCENTILES) + f"{'max':>9}", file=out)
+        for name, row in summary['latency_ms'].items():
+            values = ''.join(f'{row[f"p{p}"]:>9.1f}' if f'p{p}' in row else f'{"-":>9}' for p in PERCENTILES)
+            values += f"{row['max']:>9.1f}" if 'max' in row else f'{"-":>9}'
+            print(f"{name:<26}{row['requests']:>8}{row['responses']:>9}{row['timeouts']:>9}{values}", file=out)
+        for name, row in summary['latency_ms'].items():
+            counts = row['histogram']
+            if not sum(counts):
+                continue
+            print(f'\n{name} latency', file=out)
+            scale = 40 / max(counts)
+            lows = [0] + HISTOGRAM_EDGES_MS
+            for low, high, count in zip(lows, HISTOGRAM_EDGES_MS + [None], counts):
+                if count:
+                    label = f'{low:g}-{high:g} ms' if high else f'>{low:g} ms'
+                    print(f"  {label:>16} {'#' * max(1, int(count * scale)):<40} {count}", file=out)
+
+    if summary['event_bursts']:
+        print(f"\n{'event':<20}{'events':>8}{'bursts':>8}{'mean':>7}{'max':>6}", file=out)
+        for name, row in summary['event_bursts'].items():
+            print(f"{name:<20}{row['events']:>8}{row['bursts']:>8}{row['mean_size']:>7.1f}{row['max_size']:>6}", file=out)
+
+    gaps = summary['gaps']
+    print(f"\n{gaps['count']} gaps", file=out)
+    for g in gaps['longest']:
+        print(f"  {g['seconds']:.3f} s at {g['at']:.3f} s", file=out)
+
+
+def write_csv(summary: dict, out=sys.stdout):
+    """One row per direction and (dev, cmd), with the latencies of requests."""
+    fields = ['name', 'direction', 'dev', 'cmd', 'count', 'rate', 'crc_failures', 'responses', 'timeouts', 'mean'] + \
+             [f'p{p}' for p in PERCENTILES] + ['max']
+    writer = csv.DictWriter(out, fields, extrasaction='ignore')
+    writer.writeheader()
+    for name, row in summary['packets'].items():
+        writer.writerow({'name': name, **row, **summary['latency_ms'].get(name, {})})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a packet trace recorded with the Recorder backend',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('path', help='Trace file')
+    parser.add_argument('--start', type=float, default=None, help='Only from this many seconds into the trace')
+    parser.add_argument('--end', type=float, default=None, help='Only up to this many seconds into the trace')
+    parser.add_argument('--timeout', type=float, default=3.0, help='Seconds after which a request is unanswered')
+    parser.add_argument('--gap', type=float, default=1.0, help='Report silences longer than this many seconds')
+    parser.add_argument('--burst-gap', type=float, default=0.005, help='Events closer than this many seconds form a burst')
+    parser.add_argument('--format', choices=('text', 'csv', 'json'), default='text', help='Output format')
+    args = parser.parse_args()
+    if np is None:
+        parser.error('NumPy is needed to analyze traces: pip install numpy, or irobot_edu_sdk[trace]')
+
+    summary = analyze(load(args.path, args.start, args.end), args.timeout, args.gap, args.burst_gap)
+    if args.format == 'json':
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    elif args.format == 'csv':
+        write_csv(summary)
+    else:
+        print_text(summary)
+
+
+if __name__ == '__main__':
+    main()